@@ -1,6 +1,6 @@
 from core import embed_message, extract_message
-import time
 import os
+import sys
 
 # ANSI color codes
 GREEN = "\033[92m"
@@ -9,54 +9,68 @@ YELLOW = "\033[93m"
 RED = "\033[91m"
 RESET = "\033[0m"
 
+# Menu utama disusun sekali saat modul dimuat dan ditulis dengan satu write()
+MENU = (
+    f"{BLUE}{'='*60}\n"
+    "     STEGANOGRAFI AUDIO DENGAN ENKRIPSI ECC, RSA\n"
+    "                    DAN TRANSFORMASI DWT\n"
+    f"{'='*60}{RESET}\n"
+    f"{GREEN}1.{RESET} Sisipkan pesan ke dalam file audio\n"
+    f"{GREEN}2.{RESET} Sisipkan gambar ke dalam file audio\n"
+    f"{GREEN}3.{RESET} Ekstrak pesan dari file audio\n"
+    f"{GREEN}4.{RESET} Keluar\n"
+)
+MENU_PROMPT = f"\n{YELLOW}Pilih menu (1-4): {RESET}"
+CONTINUE_PROMPT = f"\n{YELLOW}Tekan Enter untuk melanjutkan...{RESET}"
+
+# Terminal lama (TERM=dumb / NO_COLOR) tetap memakai perintah shell
+ANSI_CLEAR = os.environ.get("TERM") != "dumb" and "NO_COLOR" not in os.environ
+
 def clear_screen():
     """Membersihkan layar terminal"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if ANSI_CLEAR:
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
+    else:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+def preview(text, limit=100):
+    """Potong teks panjang untuk ditampilkan"""
+    return text[:limit] + '…' if len(text) > limit else text
 
-def loading_animation(text="Memproses", duration=3):
-    """Animasi loading sederhana"""
-    for i in range(duration):
-        print(f"{YELLOW}{text}{'.' * (i % 3 + 1)}{RESET}", end='\r')
-        time.sleep(0.5)
-    print(" " * (len(text) + 4), end='\r')  # Clear line
+def status(text="Memproses"):
+    """Tampilkan status proses tanpa menunda pekerjaan sebenarnya"""
+    print(f"{YELLOW}{text}...{RESET}")
 
 def main():
     clear_screen()
     while True:
-        print(f"{BLUE}{'='*60}")
-        print("     STEGANOGRAFI AUDIO DENGAN ENKRIPSI ECC, RSA")
-        print("                    DAN TRANSFORMASI DWT")
-        print("="*60 + RESET)
-        print(f"{GREEN}1.{RESET} Sisipkan pesan ke dalam file audio")
-        print(f"{GREEN}2.{RESET} Sisipkan gambar ke dalam file audio")
-        print(f"{GREEN}3.{RESET} Ekstrak pesan dari file audio")
-        print(f"{GREEN}4.{RESET} Keluar")
+        sys.stdout.write(MENU)
 
-        choice = input(f"\n{YELLOW}Pilih menu (1-4): {RESET}")
+        choice = input(MENU_PROMPT)
 
         if choice == '1':
             clear_screen()
             message = input(f"{YELLOW}Masukkan pesan teks: {RESET}")
-            loading_animation("Menyembunyikan pesan")
+            status("Menyembunyikan pesan")
             embed_message(message=message)
 
         elif choice == '2':
             clear_screen()
             image_path = input(f"{YELLOW}Masukkan path gambar (misal: input/foto.png): {RESET}")
-            loading_animation("Memproses gambar")
+            status("Memproses gambar")
             try:
-                embed_message(message=image_path, is_image=True)
+                embed_message(message=image_path, kind='image')
             except Exception as e:
                 print(f"{RED}[ERROR] {e}{RESET}")
 
         elif choice == '3':
             clear_screen()
-            print(f"{YELLOW}Ekstraksi pesan dari file audio...{RESET}")
-            loading_animation("Mengekstrak data")
+            status("Ekstraksi pesan dari file audio")
             result = extract_message()
             if result:
                 print(f"\n{GREEN}Pesan berhasil diekstrak:{RESET}")
-                print(f"{result[:100] + '...' if len(result) > 100 else result}")
+                print(preview(result))
             else:
                 print(f"{RED}Gagal mengekstrak pesan atau pesan kosong.{RESET}")
 
@@ -67,7 +81,7 @@ def main():
         else:
             print(f"{RED}Pilihan tidak valid. Silakan pilih antara 1-4.{RESET}")
 
-        input(f"\n{YELLOW}Tekan Enter untuk melanjutkan...{RESET}")
+        input(CONTINUE_PROMPT)
         clear_screen()
 
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
 import os
 import json
-import base64
+import sys
+import struct
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 import soundfile as sf
 from PIL import Image
@@ -8,74 +13,367 @@ from PIL import Image
 # Modul lokal
 from steg import AudioDWT
 from crypto import SimplifiedECCCrypto, SimpleRSACrypto
-from utils import text_to_bits, bits_to_text
+from crypto.rsa import generate_private_key_pem
+from utils import bytes_to_bits, bits_to_bytes
+
+# pybase64 memakai kernel SIMD; API-nya sama dengan modul base64 bawaan
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# orjson jauh lebih cepat dari json bawaan; gunakan json jika tidak terpasang.
+# Keduanya menghasilkan bytes UTF-8 ringkas dan menerima str/bytes saat parse.
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    _loads = json.loads
+
+
+# Pool kunci yang dibuat di latar belakang agar embed berikutnya tidak
+# menunggu pembangkitan kunci RSA. Set REUSE_KEYS=0 untuk menonaktifkan.
+_KEY_POOL_ENABLED = os.environ.get("REUSE_KEYS", "1") != "0"
+# Proses pekerja (batch_embed/batch_extract, pembangkit kunci RSA) ikut mengimpor
+# modul ini; mereka tidak boleh ikut membangkitkan kunci cadangan di latar belakang
+_IN_WORKER_PROCESS = multiprocessing.parent_process() is not None
+_ecc_pool = []
+_rsa_pool = []
+_prewarm_thread = None
+
+
+def _fill_key_pool():
+    _ecc_pool.append(SimplifiedECCCrypto())
+    _rsa_pool.append(SimpleRSACrypto())
+
+
+def _prewarm():
+    global _prewarm_thread
+    if not _KEY_POOL_ENABLED or _PERSIST_KEYS or _IN_WORKER_PROCESS:
+        return
+    _prewarm_thread = threading.Thread(target=_fill_key_pool, daemon=True)
+    _prewarm_thread.start()
+
+
+# Pasangan kunci yang disimpan di disk dan dipakai ulang antar embed/sesi.
+# Opsional (PERSIST_KEYS=1) karena semua file stego lalu berbagi kunci yang sama.
+_PERSIST_KEYS = os.environ.get("PERSIST_KEYS", "0") == "1"
+_KEY_DIR = os.path.expanduser("~/.kriptografi")
+_ECC_KEY_FILE = os.path.join(_KEY_DIR, "ecc.pem")
+_RSA_KEY_FILE = os.path.join(_KEY_DIR, "rsa.pem")
+
+
+def _write_private_key(path, key_pem):
+    # Kunci privat hanya boleh dibaca pemiliknya
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(key_pem)
+
+
+@lru_cache(maxsize=1)
+def _persistent_keys():
+    try:
+        with open(_ECC_KEY_FILE, 'r') as f:
+            ecc_crypto = SimplifiedECCCrypto(key_str=f.read())
+        with open(_RSA_KEY_FILE, 'r') as f:
+            rsa_crypto = SimpleRSACrypto(key_str=f.read())
+        if ecc_crypto.key is not None and rsa_crypto.key is not None:
+            return ecc_crypto, rsa_crypto
+    except FileNotFoundError:
+        pass
+
+    print("Membuat pasangan kunci permanen di", _KEY_DIR)
+    ecc_crypto = SimplifiedECCCrypto()
+    rsa_crypto = SimpleRSACrypto()
+    os.makedirs(_KEY_DIR, exist_ok=True)
+    _write_private_key(_ECC_KEY_FILE, ecc_crypto.get_private_key())
+    _write_private_key(_RSA_KEY_FILE, rsa_crypto.get_private_key())
+    return ecc_crypto, rsa_crypto
+
+
+def rotate_keys():
+    """Hapus pasangan kunci permanen sehingga embed berikutnya membuat kunci baru"""
+    for path in (_ECC_KEY_FILE, _RSA_KEY_FILE):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    _persistent_keys.cache_clear()
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+_keygen_executor = None
+
+
+def _spawn_rsa_keygen():
+    global _keygen_executor
+    # Pekerja batch sudah berjalan paralel, dan dengan satu inti CPU proses terpisah
+    # tidak memberi overlap sama sekali (hanya biaya start); buat kunci secara langsung
+    if _IN_WORKER_PROCESS or _keygen_executor is False or (os.cpu_count() or 1) < 2:
+        return _resolved(SimpleRSACrypto())
+    try:
+        if _keygen_executor is None:
+            # 'spawn' eksplisit: fork dari proses yang sudah punya thread (_io_pool,
+            # QThreadPool GUI) bisa deadlock. Target ada di crypto.rsa sehingga anak
+            # proses hanya mengimpor paket crypto, bukan core beserta numpy/pywt/soundfile.
+            context = multiprocessing.get_context('spawn')
+            _keygen_executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+        pem_future = _keygen_executor.submit(generate_private_key_pem)
+    except (OSError, NotImplementedError, RuntimeError):
+        # Platform tanpa dukungan multiprocessing: buat kunci secara langsung
+        _keygen_executor = False
+        return _resolved(SimpleRSACrypto())
+
+    rsa_future = Future()
+
+    def _load(f):
+        global _keygen_executor
+        if f.exception() is not None:
+            # Pool rusak (mis. skrip utama tanpa guard __main__ di bawah 'spawn'):
+            # matikan pool untuk sesi ini dan buat kunci di proses ini saja
+            _keygen_executor = False
+            rsa_future.set_result(SimpleRSACrypto())
+        else:
+            rsa_future.set_result(SimpleRSACrypto(key_str=f.result()))
+
+    pem_future.add_done_callback(_load)
+    return rsa_future
+
+
+def _take_keys():
+    # Kunci RSA dikembalikan sebagai Future: jika harus dibuat baru, pembangkitannya
+    # berjalan di proses lain sementara pemanggil mengerjakan kunci/enkripsi ECC
+    if _PERSIST_KEYS:
+        ecc_crypto, rsa_crypto = _persistent_keys()
+        return ecc_crypto, _resolved(rsa_crypto)
+
+    # Tunggu pembangkitan di latar belakang daripada membuat kunci ganda
+    if _prewarm_thread is not None:
+        _prewarm_thread.join()
+
+    rsa_future = _resolved(_rsa_pool.pop()) if _rsa_pool else _spawn_rsa_keygen()
+    ecc_crypto = _ecc_pool.pop() if _ecc_pool else SimplifiedECCCrypto()
+
+    # Isi ulang pool untuk pemanggilan berikutnya
+    _prewarm()
+    return ecc_crypto, rsa_future
+
+_prewarm()
+
+
+# Penulisan file audio (libsndfile melepas GIL) berjalan di thread terpisah
+_io_pool = ThreadPoolExecutor(max_workers=1)
+
+
+@lru_cache(maxsize=4)
+def _get_dwt(wavelet='db2', level=1):
+    # AudioDWT tidak menyimpan state per file, satu instance cukup untuk semua pemanggil
+    return AudioDWT(wavelet=wavelet, level=level)
+
+
+def _read_audio(path, frames=-1):
+    # Tanpa cache: embed hanya membaca prefiks kecil yang memuat bit pesan, dan
+    # panjangnya berubah per pesan sehingga cache per (file, frames) hampir tidak pernah kena
+    return _get_dwt().read_audio(path, frames)
+
+
+@lru_cache(maxsize=4)
+def _load_and_dwt_cached(path, mtime_ns, size, frames):
+    dwt = _get_dwt()
+    stego_data, sample_rate = dwt.read_audio(path, frames)
+    coeffs = dwt.apply_dwt(stego_data)
+    # Koefisien dibagi antar pemanggil, cegah modifikasi yang tidak disengaja
+    for c in coeffs:
+        c.flags.writeable = False
+    return coeffs, sample_rate
+
+
+def _load_and_dwt(path, num_bits):
+    # Dipakai bersama oleh extract_message dan debug_extract agar file stego
+    # yang sama cukup dibaca dan ditransformasi sekali. Hanya bagian awal file
+    # yang memuat num_bits koefisien yang dibaca.
+    st = os.stat(path)
+    frames = _get_dwt().prefix_frames(num_bits)
+    return _load_and_dwt_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size, frames)
+
+
+# Kelipatan 3 byte agar setiap potongan base64 tidak membutuhkan padding.
+# Potongan 768 KiB dibaca langsung oleh BufferedReader tanpa salinan buffer tambahan.
+_B64_CHUNK_SIZE = 3 * 262144
 
 
 def image_to_base64(image_path):
 
+    encoded = bytearray()
     with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode('utf-8')
+        while chunk := img_file.read(_B64_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode('ascii')
     
 def generate_audio(output_file, duration=10, sample_rate=44100):
 
-    t = np.linspace(0, duration, int(sample_rate * duration), endpoint=False)
-    audio_data = 0.5 * np.sin(2 * np.pi * 440 * t)
-    sf.write(output_file, audio_data, sample_rate)
+    # Sinus 440 Hz berulang tepat setiap sample_rate/gcd(sample_rate, 440) sampel.
+    # Cukup hitung satu periode dengan fase dilipat ke [0, 2π) secara eksak
+    # (aritmetika integer), lalu ulangi hingga n sampel.
+    n = int(sample_rate * duration)
+    period = sample_rate // np.gcd(sample_rate, 440)
+    audio_data = ((np.arange(period) * 440) % sample_rate).astype(np.float32)
+    audio_data *= np.float32(2 * np.pi / sample_rate)
+    np.sin(audio_data, out=audio_data)
+    audio_data *= np.float32(0.5)
+    audio_data = np.resize(audio_data, n)
+    sf.write(output_file, audio_data, sample_rate, subtype='PCM_16')
     print(f"File audio sampel dibuat: {output_file}")
     return output_file
 
 
 def prepare_message(message):
 
-    # Buat instance ECC
-    print("Membuat kunci ECC...")
-    ecc_crypto = SimplifiedECCCrypto()
-    print("Kunci ECC dibuat")
+    # Ambil kunci ECC dan RSA dari pool (atau buat baru jika kosong)
+    print("Menyiapkan kunci ECC dan RSA (ini mungkin memakan waktu)...")
+    ecc_crypto, rsa_future = _take_keys()
 
-    # Enkripsi pesan dengan ECC terlebih dahulu
+    # Enkripsi pesan dengan ECC terlebih dahulu, selagi kunci RSA mungkin masih dibuat
     print("Menyiapkan enkripsi pertama dengan ECC...")
     ecc_encrypted_data_base64, ecc_key_base64 = ecc_crypto.encrypt_text(message)
-
-    # Buat instance RSA
-    print("Membuat kunci RSA (ini mungkin memakan waktu)...")
-    rsa_crypto = SimpleRSACrypto()
-    print("Kunci RSA dibuat")
+    rsa_crypto = rsa_future.result()
+    print("Kunci ECC dan RSA siap")
 
     # Enkripsi hasil ECC dengan RSA
     print("Menyiapkan enkripsi kedua dengan RSA...")
-    combined_message = json.dumps({
-        "ecc_data": ecc_encrypted_data_base64,
-        "ecc_key": ecc_key_base64
-    })
+    # [panjang kunci ECC, 8 digit hex][kunci ECC base64][data ECC base64]
+    combined_message = f"{len(ecc_key_base64):08x}{ecc_key_base64}{ecc_encrypted_data_base64}"
 
     rsa_encrypted_data_base64, rsa_key_base64 = rsa_crypto.encrypt_text(combined_message)
 
-    # Buat data header
-    header = {
-        "ecc_public_key": ecc_crypto.get_public_key(),
-        "rsa_public_key": rsa_crypto.get_public_key(),
-        "message_length": len(message),
-        "rsa_key": rsa_key_base64
-    }
+    all_bits = _frame_message(message, ecc_crypto, rsa_crypto,
+                              rsa_encrypted_data_base64, rsa_key_base64, "ecc-rsa")
+    return all_bits, ecc_crypto, rsa_crypto
 
-    # Serialisasi header dan data terenkripsi
-    header_json = json.dumps(header)
-    message_json = json.dumps(rsa_encrypted_data_base64)
 
-    # Konversi ke data biner
-    header_bits = text_to_bits(header_json)
-    message_bits = text_to_bits(message_json)
+def prepare_message_hybrid(message):
 
-    # Tambahkan panjang header (32 bit)
-    header_length_bits = format(len(header_bits), '032b')
+    print("Menyiapkan kunci ECC dan RSA (ini mungkin memakan waktu)...")
+    ecc_crypto, rsa_future = _take_keys()
+    rsa_crypto = rsa_future.result()
+    print("Kunci ECC dan RSA siap")
 
-    # Gabungkan semua bit
-    all_bits = header_length_bits + header_bits + message_bits
+    # Data besar (gambar) cukup dienkripsi sekali dengan AES; hanya kunci sesinya
+    # yang dibungkus RSA. Lapisan ECC dilewati agar data tidak membengkak oleh base64 ganda.
+    print("Menyiapkan enkripsi hibrida AES + RSA...")
+    rsa_encrypted_data_base64, rsa_key_base64 = rsa_crypto.encrypt_text(message)
 
+    all_bits = _frame_message(message, ecc_crypto, rsa_crypto,
+                              rsa_encrypted_data_base64, rsa_key_base64, "hybrid")
     return all_bits, ecc_crypto, rsa_crypto
 
 
-def embed_message(input_file=None, output_file=None, message=None, alpha=0.001, is_image=False):
+# Header frame biner: kode mode, panjang pesan asli, lalu panjang setiap field
+# (kunci publik ECC, kunci publik RSA, kunci sesi RSA, ciphertext) dalam byte
+# Frame diawali magic dan nomor versi agar file stego format lain (mis. frame JSON
+# versi lama) ditolak dengan jelas, bukan dibaca sebagai panjang field acak
+_FRAME_MAGIC = b'KSTG'
+_FRAME_VERSION = 1
+_FRAME_HEADER = struct.Struct('>4sBBIIIII')
+_FRAME_MODES = ("ecc-rsa", "hybrid")
+
+
+def _frame_message(message, ecc_crypto, rsa_crypto, rsa_encrypted_data_base64, rsa_key_base64, mode):
+
+    # Semua field sudah berupa teks ASCII (PEM/base64), cukup disambung dengan
+    # prefiks panjang tanpa escape JSON
+    fields = [
+        ecc_crypto.get_public_key().encode('ascii'),
+        rsa_crypto.get_public_key().encode('ascii'),
+        rsa_key_base64.encode('ascii'),
+        rsa_encrypted_data_base64.encode('ascii'),
+    ]
+    header = _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, _FRAME_MODES.index(mode),
+                                len(message), *map(len, fields))
+
+    # Konversi seluruh frame ke bit dalam satu langkah
+    return bytes_to_bits(b''.join([header, *fields]))
+
+
+def _parse_frame(data):
+
+    # Magic dan versi dicek lebih dulu, sebelum panjang field dipercaya
+    if data[:len(_FRAME_MAGIC)] != _FRAME_MAGIC:
+        raise ValueError("format frame tidak dikenal (bukan file stego atau format lama yang tidak didukung)")
+    if len(data) > len(_FRAME_MAGIC) and data[len(_FRAME_MAGIC)] != _FRAME_VERSION:
+        raise ValueError(f"versi frame {data[len(_FRAME_MAGIC)]} tidak didukung (didukung: {_FRAME_VERSION})")
+    if len(data) < _FRAME_HEADER.size:
+        raise ValueError(f"header tidak lengkap, butuh {_FRAME_HEADER.size} byte, hanya ada {len(data)} byte")
+
+    _, _, mode_code, message_length, *lengths = _FRAME_HEADER.unpack_from(data, 0)
+    if mode_code >= len(_FRAME_MODES):
+        raise ValueError(f"kode mode tidak dikenal: {mode_code}")
+
+    frame_end = _FRAME_HEADER.size + sum(lengths)
+    if len(data) < frame_end:
+        raise ValueError(f"pesan terpotong, butuh {frame_end} byte, hanya ada {len(data)} byte")
+
+    fields = []
+    offset = _FRAME_HEADER.size
+    for length in lengths:
+        fields.append(data[offset:offset + length].decode('ascii'))
+        offset += length
+    ecc_public_key, rsa_public_key, rsa_key_base64, rsa_encrypted_data_base64 = fields
+
+    return {
+        "mode": _FRAME_MODES[mode_code],
+        "message_length": message_length,
+        "ecc_public_key": ecc_public_key,
+        "rsa_public_key": rsa_public_key,
+        "rsa_key": rsa_key_base64,
+        "message": rsa_encrypted_data_base64,
+    }
+
+
+# Jenis payload -> (prompt input, konversi sebelum enkripsi, fungsi persiapan enkripsi,
+#                  jumlah lapisan base64 pada ciphertext)
+_PAYLOAD_KINDS = {
+    'text': ("Masukkan pesan: ", None, prepare_message, 2),
+    'image': ("Masukkan path gambar: ", image_to_base64, prepare_message_hybrid, 1),
+}
+
+# Frame selalu memuat header biner, dua kunci publik PEM dan kunci sesi RSA (~990 byte)
+_MIN_HEADER_BYTES = 960
+
+
+def _min_frame_bits(message, base64_layers):
+    # Batas bawah panjang frame; setiap lapisan base64 menambah minimal 4/3 ukuran.
+    # isascii() O(1) di CPython: payload ASCII (selalu untuk base64 gambar) diukur
+    # tanpa menyalin; hanya teks non-ASCII yang di-encode untuk panjang byte-nya
+    size = len(message) if message.isascii() else len(message.encode('utf-8'))
+    for _ in range(base64_layers):
+        size = size * 4 // 3
+    return 8 * (_MIN_HEADER_BYTES + size)
+
+
+def _print_progress(fraction):
+    sys.stdout.write(f"\rMenyisipkan bit: {fraction * 100:.0f}%")
+    if fraction >= 1:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def embed_message(input_file=None, output_file=None, message=None, alpha=0.001, kind='text',
+                  progress_callback=_print_progress):
+
+    if kind not in _PAYLOAD_KINDS:
+        raise ValueError(f"Jenis pesan tidak dikenal: {kind}")
+    prompt, convert, prepare, base64_layers = _PAYLOAD_KINDS[kind]
 
     os.makedirs('output', exist_ok=True)
 
@@ -91,17 +389,14 @@ def embed_message(input_file=None, output_file=None, message=None, alpha=0.001,
         output_file = 'output/stego.wav'
 
     if message is None:
-        if is_image:
-            message = input("Masukkan path gambar: ")
-        else:
-            message = input("Masukkan pesan: ")
+        message = input(prompt)
 
-    if is_image:
-        print(f"Memproses gambar: {message}")
+    if convert is not None:
+        print(f"Memproses {kind}: {message}")
         try:
-            message = image_to_base64(message)
+            message = convert(message)
         except Exception as e:
-            print(f"Gagal membaca gambar: {e}")
+            print(f"Gagal membaca {kind}: {e}")
             return None
 
     if not message:
@@ -119,57 +414,78 @@ def embed_message(input_file=None, output_file=None, message=None, alpha=0.001,
     print(f"Menggunakan alpha = {alpha}")
 
     try:
-        print("Menyiapkan pesan dengan enkripsi ganda ECC dan RSA...")
-        all_bits, ecc_crypto, rsa_crypto = prepare_message(message)
-        print(f"Pesan terenkripsi dengan panjang bit: {len(all_bits)} bit")
+        dwt = _get_dwt()
 
-        dwt = AudioDWT(wavelet='db2', level=1)
+        # Tolak pesan yang pasti tidak muat sebelum menghabiskan waktu untuk enkripsi
+        capacity = dwt.detail_capacity(sf.info(input_file).frames)
+        if _min_frame_bits(message, base64_layers) > capacity:
+            print(f"Pesan terlalu panjang!, Kapasitas maksimal: {capacity} bit")
+            return None
 
-        audio_data, sample_rate = dwt.read_audio(input_file)
-        coeffs = dwt.apply_dwt(audio_data)
+        print("Menyiapkan pesan dengan enkripsi ganda ECC dan RSA...")
+        all_bits, ecc_crypto, rsa_crypto = prepare(message)
+        print(f"Pesan terenkripsi dengan panjang bit: {len(all_bits)} bit")
 
-        capacity = len(coeffs[1])
         if len(all_bits) > capacity:
             print(f"Pesan terlalu panjang!, Kapasitas maksimal: {capacity} bit, "
                   f"Pesan terenkripsi: {len(all_bits)} bit")
             return None
 
-        modified_coeffs = dwt.embed_bits_in_coefficients(coeffs, all_bits, alpha=alpha)
-        reconstructed_data = dwt.apply_idwt(modified_coeffs)
+        # Hanya bagian awal audio yang memuat koefisien pembawa bit yang perlu
+        # ditransformasi; sisa file disalin per blok saat disimpan
+        audio_data, sample_rate = _read_audio(input_file, dwt.prefix_frames(len(all_bits)))
+        coeffs = dwt.apply_dwt(audio_data)
+
+        # Koefisien baru saja dihitung dan tidak dibagi, modifikasi langsung tanpa salinan
+        modified_coeffs = dwt.embed_bits_in_coefficients(coeffs, all_bits, alpha=np.float32(alpha),
+                                                         progress_callback=progress_callback,
+                                                         copy=False)
+        # Potongan [:n] hanya view, tidak menyalin hasil IDWT
+        reconstructed_data = dwt.apply_idwt(modified_coeffs)[:len(audio_data)]
 
-        if len(audio_data.shape) > 1 and audio_data.shape[1] > 1:
-            min_len = min(len(reconstructed_data), len(audio_data))
-            reconstructed_stereo = np.zeros((min_len, audio_data.shape[1]))
-            reconstructed_stereo[:, 0] = reconstructed_data[:min_len]
-            for ch in range(1, audio_data.shape[1]):
-                reconstructed_stereo[:, ch] = audio_data[:min_len, ch]
-            reconstructed_data = reconstructed_stereo
+        if audio_data.ndim > 1 and audio_data.shape[1] > 1:
+            # Hanya channel pertama yang berubah, tulis langsung ke buffer asli
+            audio_data[:, 0] = reconstructed_data
+            reconstructed_data = audio_data
 
-        dwt.save_audio(output_file, reconstructed_data, sample_rate)
-        print(f"Pesan telah berhasil disembunyikan dalam file: {output_file}")
+        # Simpan audio di latar belakang selagi file kunci dan info ditulis
+        save_future = _io_pool.submit(dwt.save_audio_with_tail, output_file,
+                                      reconstructed_data, sample_rate, input_file)
+
+        # Serialisasi setiap kunci cukup sekali untuk file .key dan .info
+        ecc_pub = ecc_crypto.get_public_key()
+        ecc_priv = ecc_crypto.get_private_key()
+        rsa_pub = rsa_crypto.get_public_key()
+        rsa_priv = rsa_crypto.get_private_key()
 
         key_file = output_file + ".key"
+        key_blob = (
+            "== KUNCI ECC ==\n"
+            f"PUBLIC KEY ECC:\n{ecc_pub}\n"
+            f"PRIVATE KEY ECC:\n{ecc_priv}\n"
+            "== KUNCI RSA ==\n"
+            f"PUBLIC KEY RSA:\n{rsa_pub}\n"
+            f"PRIVATE KEY RSA:\n{rsa_priv}\n"
+        )
         with open(key_file, 'w') as f:
-            f.write("== KUNCI ECC ==\n")
-            f.write(f"PUBLIC KEY ECC:\n{ecc_crypto.get_public_key()}\n")
-            f.write(f"PRIVATE KEY ECC:\n{ecc_crypto.get_private_key()}\n")
-            f.write("== KUNCI RSA ==\n")
-            f.write(f"PUBLIC KEY RSA:\n{rsa_crypto.get_public_key()}\n")
-            f.write(f"PRIVATE KEY RSA:\n{rsa_crypto.get_private_key()}\n")
+            f.write(key_blob)
 
         info_file = output_file + ".info"
         info = {
             "bits_length": len(all_bits),
-            "ecc_public_key": ecc_crypto.get_public_key(),
-            "ecc_private_key": ecc_crypto.get_private_key(),
-            "rsa_public_key": rsa_crypto.get_public_key(),
-            "rsa_private_key": rsa_crypto.get_private_key(),
+            "ecc_public_key": ecc_pub,
+            "ecc_private_key": ecc_priv,
+            "rsa_public_key": rsa_pub,
+            "rsa_private_key": rsa_priv,
             "message_length": len(message),
             "alpha": alpha
         }
-        with open(info_file, 'w') as f:
-            json.dump(info, f)
+        with open(info_file, 'wb') as f:
+            f.write(_dumps(info))
 
+        # Pastikan file stego sudah lengkap sebelum dilaporkan ke pemanggil
+        save_future.result()
+        print(f"Pesan telah berhasil disembunyikan dalam file: {output_file}")
         print(f"Kunci disimpan di: {key_file}")
         print(f"Informasi tambahan di: {info_file}")
         return output_file
@@ -181,93 +497,79 @@ def embed_message(input_file=None, output_file=None, message=None, alpha=0.001,
 
 def extract_message(stego_file=None):
     from crypto import SimpleRSACrypto, SimplifiedECCCrypto
-    from utils import bits_to_text
 
     if stego_file is None:
         stego_file = input("Masukkan path file audio stego: ").strip()
-    if not stego_file or not os.path.exists(stego_file):
+    if not stego_file:
         print("File tidak ditemukan")
         return None
 
+    dwt = _get_dwt()
+
+    # Cek header audio lebih dulu agar file yang tidak ada langsung gagal
+    try:
+        sf.info(stego_file)
+    except Exception as e:
+        print(f"File tidak dapat dibaca: {e}")
+        return None
+
     info_file = stego_file + ".info"
     ecc_private_key = None
     rsa_private_key = None
     alpha = 0.001
 
-    if os.path.exists(info_file):
-        try:
-            with open(info_file, 'r') as f:
-                info = json.load(f)
-            num_bits = info["bits_length"]
-            ecc_private_key = info.get("ecc_private_key")
-            rsa_private_key = info.get("rsa_private_key")
-            if "alpha" in info:
-                alpha = info["alpha"]
-            print(f"Menggunakan alpha dari file info: {alpha}")
-        except json.JSONDecodeError:
-            num_bits = int(input("Jumlah bit pesan: "))
-    else:
+    try:
+        with open(info_file, 'rb') as f:
+            info = _loads(f.read())
+        num_bits = info["bits_length"]
+        ecc_private_key = info.get("ecc_private_key")
+        rsa_private_key = info.get("rsa_private_key")
+        if "alpha" in info:
+            alpha = info["alpha"]
+        print(f"Menggunakan alpha dari file info: {alpha}")
+    except (FileNotFoundError, json.JSONDecodeError):
         num_bits = int(input("Jumlah bit pesan: "))
 
-    dwt = AudioDWT(wavelet='db2', level=1)
-
     try:
-        stego_data, sample_rate = dwt.read_audio(stego_file)
-        coeffs = dwt.apply_dwt(stego_data)
+        coeffs, sample_rate = _load_and_dwt(stego_file, num_bits)
         all_extracted_bits = dwt.extract_bits_from_coefficients(coeffs, num_bits, alpha=alpha)
 
-        if len(all_extracted_bits) < 32:
-            print("Data ekstraksi terlalu pendek!")
-            return None
+        data = bits_to_bytes(all_extracted_bits)
 
-        header_length_bits = all_extracted_bits[:32]
         try:
-            header_length = int(header_length_bits, 2)
-        except ValueError:
-            print(f"Bit header tidak valid: {header_length_bits}")
+            frame = _parse_frame(data)
+        except ValueError as e:
+            print(f"Error parsing frame: {e}")
             return None
 
-        if len(all_extracted_bits) < 32 + header_length:
-            print("Header tidak lengkap!")
-            return None
-
-        header_bits = all_extracted_bits[32:32 + header_length]
-        header_json = bits_to_text(header_bits)
-
-        try:
-            header = json.loads(header_json)
-            ecc_public_key = header["ecc_public_key"]
-            rsa_public_key = header["rsa_public_key"]
-            message_length = header["message_length"]
-            rsa_key_base64 = header["rsa_key"]
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Error parsing header: {e}")
-            return None
+        mode = frame["mode"]
+        rsa_key_base64 = frame["rsa_key"]
+        rsa_encrypted_data_base64 = frame["message"]
 
-        message_bits = all_extracted_bits[32 + header_length:]
-        message_json = bits_to_text(message_bits)
-
-        try:
-            rsa_encrypted_data_base64 = json.loads(message_json)
-        except json.JSONDecodeError:
-            print("Gagal parse pesan terenkripsi.")
-            return None
-
-        rsa_crypto = SimpleRSACrypto()
-        if rsa_private_key:
-            rsa_crypto.load_key(rsa_private_key)
+        # Muat kunci dari file info tanpa membangkitkan kunci RSA sementara.
+        # Kunci baru tidak akan pernah bisa mendekripsi, jadi kunci yang hilang
+        # atau gagal dimuat langsung dilaporkan sebagai error.
+        if not rsa_private_key:
+            raise ValueError("Kunci privat RSA tidak ditemukan di file info")
+        rsa_crypto = SimpleRSACrypto(key_str=rsa_private_key)
+        if rsa_crypto.key is None or not rsa_crypto.key.has_private():
+            raise ValueError("Kunci privat RSA di file info tidak valid")
 
         try:
             combined_message = rsa_crypto.decrypt_text(rsa_encrypted_data_base64, rsa_key_base64)
-            combined_data = json.loads(combined_message)
-            ecc_encrypted_data_base64 = combined_data["ecc_data"]
-            ecc_key_base64 = combined_data["ecc_key"]
 
-            ecc_crypto = SimplifiedECCCrypto()
-            if ecc_private_key:
-                ecc_crypto.load_key(ecc_private_key)
+            if mode == "hybrid":
+                decrypted_message = combined_message
+            else:
+                ecc_key_length = int(combined_message[:8], 16)
+                ecc_key_base64 = combined_message[8:8 + ecc_key_length]
+                ecc_encrypted_data_base64 = combined_message[8 + ecc_key_length:]
 
-            decrypted_message = ecc_crypto.decrypt_text(ecc_encrypted_data_base64, ecc_key_base64)
+                if not ecc_private_key:
+                    raise ValueError("Kunci privat ECC tidak ditemukan di file info")
+                ecc_crypto = SimplifiedECCCrypto(key_str=ecc_private_key)
+
+                decrypted_message = ecc_crypto.decrypt_text(ecc_encrypted_data_base64, ecc_key_base64)
             print(f"\nPesan yang diekstrak:\n{decrypted_message}")
             return decrypted_message
 
@@ -285,37 +587,38 @@ def debug_extract(stego_file=None, num_bits=None):
     if stego_file is None:
         stego_file = input("Masukkan path file audio yang akan di-debug: ").strip()
     
-    if not stego_file or not os.path.exists(stego_file):
+    if not stego_file:
         print("File tidak ditemukan")
         return
     
+    # Buat instance DWT
+    dwt = _get_dwt()
+    
+    # Cek header audio stego lebih dulu agar file yang tidak ada langsung gagal
+    try:
+        sf.info(stego_file)
+    except Exception as e:
+        print(f"ERROR: File tidak dapat dibaca: {str(e)}")
+        return
+    
     # Cek apakah ada file info untuk mendapatkan jumlah bit
     if num_bits is None:
         info_file = stego_file + ".info"
-        if os.path.exists(info_file):
-            try:
-                with open(info_file, 'r') as f:
-                    info = json.load(f)
-                num_bits = info["bits_length"]
-                print(f"Jumlah bit dari file info: {num_bits}")
-            except Exception as e:
-                print(f"Error membaca file info: {str(e)}")
-                num_bits = int(input("Masukkan jumlah bit yang akan diekstrak untuk debug: "))
-        else:
+        try:
+            with open(info_file, 'rb') as f:
+                info = _loads(f.read())
+            num_bits = info["bits_length"]
+            print(f"Jumlah bit dari file info: {num_bits}")
+        except FileNotFoundError:
+            num_bits = int(input("Masukkan jumlah bit yang akan diekstrak untuk debug: "))
+        except Exception as e:
+            print(f"Error membaca file info: {str(e)}")
             num_bits = int(input("Masukkan jumlah bit yang akan diekstrak untuk debug: "))
-    
-    # Buat instance DWT
-    dwt = AudioDWT(wavelet='db2', level=1)
     
     try:
         # Ekstrak bit dari file audio
         print(f"Mengekstrak {num_bits} bit dari file...")
-        
-        # Baca file audio stego
-        stego_data, sample_rate = dwt.read_audio(stego_file)
-        
-        # Terapkan DWT
-        coeffs = dwt.apply_dwt(stego_data)
+        coeffs, sample_rate = _load_and_dwt(stego_file, num_bits)
         
         # Ekstrak bit dengan alpha default
         alpha = 0.001  # Nilai alpha default untuk debug
@@ -323,64 +626,101 @@ def debug_extract(stego_file=None, num_bits=None):
         
         print(f"Jumlah bit yang berhasil diekstrak: {len(all_extracted_bits)}")
         
-        if len(all_extracted_bits) < 32:
-            print("ERROR: Data terlalu pendek! Minimal 32 bit diperlukan untuk header.")
-            return
-        
-        # Baca panjang header
-        header_length_bits = all_extracted_bits[:32]
-        try:
-            header_length = int(header_length_bits, 2)
-            print(f"Panjang header: {header_length} bit")
-        except ValueError:
-            print(f"ERROR: Bit header panjang tidak valid: {header_length_bits}")
-            return
+        data = bits_to_bytes(all_extracted_bits)
         
-        # Cek panjang data
-        if len(all_extracted_bits) < 32 + header_length:
-            print(f"ERROR: Data terlalu pendek! Butuh {32 + header_length} bit, hanya ada {len(all_extracted_bits)} bit.")
+        if len(data) < _FRAME_HEADER.size:
+            print(f"ERROR: Data terlalu pendek! Minimal {_FRAME_HEADER.size * 8} bit diperlukan untuk header.")
             return
         
-        # Ekstrak header
-        header_bits = all_extracted_bits[32:32+header_length]
-        header_text = bits_to_text(header_bits)
-        
-        print("\n===== HEADER TERekstrak (3 baris pertama) =====")
-        header_lines = header_text.split('\n')
-        for i in range(min(3, len(header_lines))):
-            print(header_lines[i])
+        # Baca header biner
+        magic, version, mode_code, message_length, *lengths = _FRAME_HEADER.unpack_from(data, 0)
+        print("\n===== HEADER TERekstrak =====")
+        print(f"Magic: {magic!r}, versi: {version}")
+        print(f"Kode mode: {mode_code}")
+        print(f"Message length: {message_length}")
+        print(f"Panjang field (ECC pub, RSA pub, kunci sesi, pesan): {lengths}")
         
         try:
-            header = json.loads(header_text)
-            print("\n== HEADER DIPARSE DENGAN SUKSES ==")
-            print(f"Message length: {header.get('message_length', 'N/A')}")
-            if 'ecc_public_key' in header:
-                print("ECC public key tersedia")
-            if 'rsa_public_key' in header:
-                print("RSA public key tersedia")
-            if 'rsa_key' in header:
-                print("RSA session key tersedia")
-        except json.JSONDecodeError as e:
-            print(f"\nERROR: Gagal mem-parse header JSON: {str(e)}")
-            print(f"Header JSON raw: {header_text[:100]}...")
-        
-        # Ekstrak message
-        if len(all_extracted_bits) <= 32 + header_length:
-            print("ERROR: Tidak ada data pesan!")
+            frame = _parse_frame(data)
+        except ValueError as e:
+            print(f"\nERROR: Gagal mem-parse frame: {str(e)}")
             return
         
-        message_bits = all_extracted_bits[32+header_length:]
-        message_text = bits_to_text(message_bits)
+        print("\n== HEADER DIPARSE DENGAN SUKSES ==")
+        print(f"Mode enkripsi: {frame['mode']}")
+        if frame['ecc_public_key']:
+            print("ECC public key tersedia")
+        if frame['rsa_public_key']:
+            print("RSA public key tersedia")
+        if frame['rsa_key']:
+            print("RSA session key tersedia")
         
+        message_text = frame['message']
         print("\n== PESAN TERENKRIPSI (awal) ==")
         print(message_text[:100] + "..." if len(message_text) > 100 else message_text)
         
-        try:
-            message_json = json.loads(message_text)
-            print("\n== PESAN BERHASIL DIPARSE ==")
-            print("Pesan dalam format JSON yang valid")
-        except json.JSONDecodeError as e:
-            print(f"\nERROR: Gagal mem-parse pesan JSON: {str(e)}")
+        print("\n== PESAN LENGKAP ==")
+        print(f"Panjang pesan terenkripsi: {len(message_text)} byte")
             
     except Exception as e:
-        print(f"ERROR: {str(e)}")
\ No newline at end of file
+        print(f"ERROR: {str(e)}")
+
+# Argumen yang wajib ada di setiap job batch_embed, selain itu pekerja akan meminta input()
+_BATCH_JOB_KEYS = ('input_file', 'output_file', 'message')
+
+
+def _embed_job(job):
+    # Progres per bit dari beberapa proses akan saling menimpa di terminal
+    try:
+        return embed_message(**{'progress_callback': None, **job})
+    except Exception as e:
+        # Satu job yang gagal tidak boleh membatalkan seluruh batch
+        print(f"Error embedding {job.get('output_file')}: {e}")
+        return None
+
+
+def _extract_job(stego_file):
+    try:
+        return extract_message(stego_file)
+    except Exception as e:
+        print(f"Error ekstraksi {stego_file}: {e}")
+        return None
+
+
+def _run_batch(func, items, valid, workers):
+    # Item yang tidak valid langsung bernilai None tanpa dikirim ke pekerja;
+    # urutan hasil tetap sama dengan urutan item
+    results = [None] * len(items)
+    indices = [i for i, ok in enumerate(valid) if ok]
+    if indices:
+        # 'spawn' aman di semua platform dan tidak mewarisi thread pool kunci induk
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            for i, result in zip(indices, executor.map(func, [items[i] for i in indices])):
+                results[i] = result
+    return results
+
+
+def batch_embed(jobs, workers=None):
+    """Sisipkan banyak pesan secara paralel; setiap job berisi argumen embed_message"""
+    jobs = list(jobs)
+    valid = []
+    for job in jobs:
+        missing = [key for key in _BATCH_JOB_KEYS if not job.get(key)]
+        if missing:
+            print(f"Job dilewati, argumen tidak lengkap: {', '.join(missing)}")
+        valid.append(not missing)
+    return _run_batch(_embed_job, jobs, valid, workers)
+
+
+def batch_extract(stego_files, workers=None):
+    """Ekstrak pesan dari banyak file stego secara paralel; setiap file butuh file .info"""
+    stego_files = list(stego_files)
+    valid = []
+    for stego_file in stego_files:
+        # Tanpa .info extract_message akan meminta jumlah bit lewat input()
+        has_info = os.path.isfile(stego_file + ".info")
+        if not has_info:
+            print(f"File dilewati, {stego_file}.info tidak ditemukan")
+        valid.append(has_info)
+    return _run_batch(_extract_job, stego_files, valid, workers)
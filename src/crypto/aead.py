@@ -0,0 +1,60 @@
+import os
+from Cryptodome.Cipher import AES
+
+from .cpu import HAS_AESNI
+
+try:
+    # AES-GCM lewat OpenSSL EVP (AES-NI/VAES) bila paket cryptography tersedia.
+    # API Cipher dipakai (bukan AESGCM) karena menerima tag terpisah dan bisa menulis
+    # langsung ke buffer, sesuai tata letak nonce||tag||ciphertext tanpa salinan tambahan.
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.exceptions import InvalidTag
+except ImportError:
+    Cipher = None
+
+# Format blob: nonce (12) || tag (16) || ciphertext, sama untuk kedua backend.
+# Nonce 96-bit adalah ukuran standar GCM: langsung menjadi counter awal tanpa GHASH tambahan
+NONCE_SIZE = 12
+TAG_SIZE = 16
+HEADER_SIZE = NONCE_SIZE + TAG_SIZE
+
+
+def gcm_encrypt(key, data):
+
+    encrypted_data = bytearray(HEADER_SIZE + len(data))
+    view = memoryview(encrypted_data)
+    nonce = os.urandom(NONCE_SIZE)
+    view[:NONCE_SIZE] = nonce
+    # Nonce, tag dan ciphertext ditulis langsung ke satu buffer tanpa penggabungan
+    if Cipher is not None:
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+        encryptor.update_into(data, view[HEADER_SIZE:])
+        encryptor.finalize()
+        view[NONCE_SIZE:HEADER_SIZE] = encryptor.tag
+    else:
+        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce, use_aesni=HAS_AESNI)
+        cipher.encrypt(data, output=view[HEADER_SIZE:])
+        view[NONCE_SIZE:HEADER_SIZE] = cipher.digest()
+    return encrypted_data
+
+
+def gcm_decrypt(key, encrypted_data):
+
+    # Pisahkan nonce, tag dan ciphertext sebagai view, tanpa menyalin payload
+    view = memoryview(encrypted_data)
+    nonce = view[:NONCE_SIZE]
+    tag = view[NONCE_SIZE:HEADER_SIZE]
+    ciphertext = view[HEADER_SIZE:]
+
+    if Cipher is not None:
+        # modes.GCM hanya menerima bytes untuk nonce/tag (28 byte); ciphertext tetap view
+        decryptor = Cipher(algorithms.AES(key), modes.GCM(bytes(nonce), bytes(tag))).decryptor()
+        plaintext = decryptor.update(ciphertext)
+        try:
+            decryptor.finalize()
+        except InvalidTag:
+            # Samakan dengan pesan PyCryptodome agar penanganan error pemanggil tetap sama
+            raise ValueError("MAC check failed") from None
+        return plaintext
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce, use_aesni=HAS_AESNI)
+    return cipher.decrypt_and_verify(ciphertext, tag)
@@ -0,0 +1,13 @@
+import logging
+
+_log = logging.getLogger(__name__)
+
+try:
+    # Modul internal PyCryptodome; bila tidak tersedia, PyCryptodome tetap mendeteksi sendiri
+    from Cryptodome.Util import _cpu_features
+    HAS_AESNI = bool(_cpu_features.have_aes_ni())
+except (ImportError, AttributeError):
+    HAS_AESNI = True
+
+if not HAS_AESNI:
+    _log.warning("AES-NI tidak tersedia; throughput AES akan ~5x lebih rendah")
@@ -1,95 +1,156 @@
-import os
-import hashlib
-import base64
+import logging
+from binascii import b2a_base64, a2b_base64
 from Cryptodome.PublicKey import ECC
-from Cryptodome.Random import get_random_bytes
-from Cryptodome.Cipher import AES
-from Cryptodome.Util.Padding import pad, unpad
+from Cryptodome.Hash import SHA256
+from Cryptodome.Protocol.KDF import HKDF
+
+from .aead import gcm_encrypt, gcm_decrypt
+from .hashing import sha256_hex
+
+_log = logging.getLogger(__name__)
+
+# ECDH di bawah memakai aritmetika titik*skalar kurva NIST (Weierstrass).
+# Ed25519/Curve25519 memakai format dan aritmetika lain sehingga ditolak.
+_NIST_CURVES = frozenset((
+    'p192', 'prime192v1', 'secp192r1',
+    'p224', 'secp224r1',
+    'p256', 'prime256v1', 'secp256r1',
+    'p384', 'secp384r1',
+    'p521', 'secp521r1',
+))
+
+
+def _is_nist_curve(curve):
+
+    return curve.lower().replace('nist ', '').replace('-', '') in _NIST_CURVES
 
 class SimplifiedECCCrypto:
-    def __init__(self):
+    def __init__(self, key_str=None, curve='P-256', lazy=False):
 
+        if not _is_nist_curve(curve):
+            raise ValueError(f"Kurva ECC tidak didukung: {curve} (hanya kurva NIST P-192 s.d. P-521)")
+        self.curve = curve
         self.key = None
-        self.generate_key()
+        # PEM hasil ekspor disimpan per kunci, dikosongkan saat kunci berganti
+        self._pem = {}
+        # Kunci yang sudah ada cukup dimuat, tanpa membangkitkan kunci baru.
+        # Dengan lazy=True kunci baru dibuat saat pertama kali diekspor.
+        if key_str is not None:
+            self.load_key(key_str)
+        elif not lazy:
+            self.generate_key()
     
     def generate_key(self):
 
-        self.key = ECC.generate(curve='P-256')
+        self.key = ECC.generate(curve=self.curve)
+        self._pem = {}
         return self.key
     
     def get_public_key(self):
 
         if not self.key:
             self.generate_key()
-        return self.key.public_key().export_key(format='PEM')
+        if 'public' not in self._pem:
+            self._pem['public'] = self.key.public_key().export_key(format='PEM')
+        return self._pem['public']
     
     def get_private_key(self):
 
         if not self.key:
             self.generate_key()
-        return self.key.export_key(format='PEM')
+        if 'private' not in self._pem:
+            self._pem['private'] = self.key.export_key(format='PEM')
+        return self._pem['private']
     
     def encrypt_text(self, plaintext):
-        # Buat kunci sesi acak untuk AES
-        session_key = get_random_bytes(16)
+        # Data yang sudah berupa bytes langsung dienkripsi tanpa encode ulang
+        if not isinstance(plaintext, (bytes, bytearray, memoryview)):
+            plaintext = plaintext.encode('utf-8')
+        encrypted_data, ephemeral_public = self.encrypt_bytes(plaintext)
         
-        # Enkripsi menggunakan AES
-        cipher = AES.new(session_key, AES.MODE_CBC)
-        ciphertext = cipher.encrypt(pad(plaintext.encode('utf-8'), AES.block_size))
+        # Konversi ke base64 untuk memudahkan penanganan
+        encrypted_data_base64 = b2a_base64(encrypted_data, newline=False).decode('ascii')
+        ephemeral_public_base64 = b2a_base64(ephemeral_public, newline=False).decode('ascii')
         
-        # Tambahkan IV ke ciphertext
-        encrypted_data = cipher.iv + ciphertext
+        return encrypted_data_base64, ephemeral_public_base64
+    
+    def _derive_key(self, private_scalar, public_point, ephemeral_public):
+        # Kunci AES diturunkan dari koordinat x rahasia bersama ECDH lewat HKDF-SHA256;
+        # kunci publik ephemeral ikut sebagai konteks agar kunci terikat ke pesan ini.
+        # Panjang rahasia mengikuti ukuran field kurva (32 byte P-256, 66 byte P-521).
+        shared = (public_point * private_scalar).x
+        field_size = (public_point.size_in_bits() + 7) // 8
+        return HKDF(int(shared).to_bytes(field_size, 'big'), 32, b'', SHA256, context=ephemeral_public)
+    
+    def encrypt_bytes(self, data):
+        if not self.key:
+            self.generate_key()
         
-        # Untuk implementasi sederhana, bukannya mengenkripsi session_key dengan ECC,
-        # kita hanya akan mengembalikan session_key langsung
-        # Di aplikasi nyata, session_key harus dienkripsi dengan kunci publik penerima
+        # ECIES: pasangan kunci ephemeral per pesan, kunci sesi tidak pernah dikirim.
+        # Penerima cukup memegang kunci privat ECC untuk menurunkan kunci yang sama.
+        ephemeral = ECC.generate(curve=self.key.curve)
+        ephemeral_public = ephemeral.public_key().export_key(format='raw')
+        session_key = self._derive_key(ephemeral.d, self.key.pointQ, ephemeral_public)
         
-        # Konversi ke base64 untuk memudahkan penanganan
-        encrypted_data_base64 = base64.b64encode(encrypted_data).decode('utf-8')
-        session_key_base64 = base64.b64encode(session_key).decode('utf-8')
+        # Enkripsi menggunakan AES-GCM (terautentikasi, tanpa padding).
+        encrypted_data = gcm_encrypt(session_key, data)
         
-        return encrypted_data_base64, session_key_base64
+        return encrypted_data, ephemeral_public
     
     def load_key(self, key_str, is_private=True):
 
+        # Cek header PEM lebih dulu: kunci publik yang diberikan saat kunci privat
+        # diperlukan langsung ditolak tanpa parsing DER/ASN.1 penuh
+        header = key_str.lstrip()[:40]
+        if is_private and (b'PUBLIC' if isinstance(header, bytes) else 'PUBLIC') in header:
+            _log.warning("Error saat memuat kunci ECC: kunci publik diberikan, kunci privat diperlukan")
+            return False
+        
         try:
-            if is_private:
-                self.key = ECC.import_key(key_str)
-            else:
-                self.key = ECC.import_key(key_str)
-            return True
+            key = ECC.import_key(key_str)
         except Exception as e:
-            print(f"Error saat memuat kunci ECC: {str(e)}")
+            _log.warning("Error saat memuat kunci ECC: %s", e)
+            return False
+        if not _is_nist_curve(key.curve):
+            _log.warning("Error saat memuat kunci ECC: kurva %s tidak didukung", key.curve)
             return False
+        
+        # Kurva mengikuti kunci yang dimuat, bukan nilai bawaan konstruktor
+        self.key = key
+        self.curve = key.curve
+        self._pem = {}
+        return True
     
-    def decrypt_text(self, encrypted_data_base64, session_key_base64):
+    def decrypt_text(self, encrypted_data_base64, ephemeral_public_base64):
         try:
             # Dekode dari base64
-            encrypted_data = base64.b64decode(encrypted_data_base64)
-            session_key = base64.b64decode(session_key_base64)
+            encrypted_data = a2b_base64(encrypted_data_base64)
+            ephemeral_public = a2b_base64(ephemeral_public_base64)
             
-            # Pisahkan IV dan ciphertext
-            iv = encrypted_data[:16]
-            ciphertext = encrypted_data[16:]
-            
-            # Dekripsi menggunakan AES
-            try:
-                cipher = AES.new(session_key, AES.MODE_CBC, iv)
-                plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
-                return plaintext.decode('utf-8')
-            except ValueError as e:
-                if "padding is incorrect" in str(e):
-                    print("[DEBUG] ECC/AES: Padding tidak valid - kemungkinan data rusak")
-                    raise ValueError("Padding AES tidak valid, data mungkin rusak") from e
-                else:
-                    print(f"[DEBUG] ECC/AES: Error dekripsi: {str(e)}")
-                    raise
+            return self.decrypt_bytes(encrypted_data, ephemeral_public).decode('utf-8')
         except Exception as e:
-            print(f"[DEBUG] ECC Dekripsi gagal: {type(e).__name__}: {str(e)}")
+            _log.debug("ECC Dekripsi gagal: %s: %s", type(e).__name__, e)
             raise
     
+    def decrypt_bytes(self, encrypted_data, ephemeral_public):
+        if self.key is None or not self.key.has_private():
+            raise ValueError("Kunci privat ECC tidak tersedia untuk dekripsi")
+        
+        # import_key memvalidasi bahwa titik berada pada kurva kunci penerima
+        point = ECC.import_key(ephemeral_public, curve_name=self.key.curve).pointQ
+        session_key = self._derive_key(self.key.d, point, ephemeral_public)
+        
+        # Dekripsi menggunakan AES-GCM sekaligus verifikasi tag
+        try:
+            return gcm_decrypt(session_key, encrypted_data)
+        except ValueError as e:
+            if "MAC check failed" in str(e):
+                _log.debug("ECC/AES: Tag GCM tidak valid - kemungkinan data rusak")
+                raise ValueError("Tag AES-GCM tidak valid, data mungkin rusak") from e
+            else:
+                _log.debug("ECC/AES: Error dekripsi: %s", e)
+                raise
+    
     def hash_message(self, message):
 
-        if isinstance(message, str):
-            message = message.encode('utf-8')
-        return hashlib.sha256(message).hexdigest() 
\ No newline at end of file
+        return sha256_hex(message) 
\ No newline at end of file
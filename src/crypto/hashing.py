@@ -0,0 +1,10 @@
+import hashlib
+
+
+def sha256_hex(message):
+
+    # Jalur cepat untuk bytes (cek tipe eksak tanpa isinstance); str di-encode dulu,
+    # tipe buffer lain (bytearray, memoryview) diteruskan langsung ke hashlib
+    if type(message) is not bytes and isinstance(message, str):
+        message = message.encode('utf-8')
+    return hashlib.sha256(message).hexdigest()
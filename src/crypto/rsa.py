@@ -1,111 +1,163 @@
 import os
-import base64
-import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from binascii import b2a_base64, a2b_base64
 from Cryptodome.PublicKey import RSA
 from Cryptodome.Cipher import PKCS1_OAEP
-from Cryptodome.Random import get_random_bytes
-from Cryptodome.Cipher import AES
-from Cryptodome.Util.Padding import pad, unpad
+
+from .aead import gcm_encrypt, gcm_decrypt
+from .hashing import sha256_hex
+
+_log = logging.getLogger(__name__)
+
+
+def generate_private_key_pem(key_size=2048):
+
+    # Target pembangkitan kunci di proses terpisah: anak proses cukup mengimpor paket
+    # crypto, dan objek kunci Cryptodome tidak bisa di-pickle sehingga yang dikirim PEM
+    return RSA.generate(key_size, e=65537).export_key().decode('utf-8')
 
 class SimpleRSACrypto:
-    def __init__(self, key_size=2048):
+    def __init__(self, key_size=2048, key_str=None):
 
         self.key_size = key_size
         self.key = None
-        self.generate_key()
+        # PEM hasil ekspor dan objek OAEP disimpan per kunci, diganti saat kunci berganti
+        self._pem = {}
+        self._oaep = None
+        # Kunci yang sudah ada cukup dimuat, tanpa membangkitkan kunci baru
+        if key_str is not None:
+            self.load_key(key_str)
+        else:
+            self.generate_key()
     
     def generate_key(self):
 
-        self.key = RSA.generate(self.key_size)
+        # e=65537 dipatok eksplisit; kunci hasil generate menyimpan p, q, dp, dq dan u
+        # sehingga operasi privat PyCryptodome selalu memakai CRT
+        self.key = RSA.generate(self.key_size, e=65537)
+        self._key_changed()
         return self.key
     
+    def _key_changed(self):
+
+        self._pem = {}
+        # Satu objek OAEP (kunci privat juga bisa mengenkripsi) dipakai ulang untuk
+        # setiap enkripsi/dekripsi, tanpa inisialisasi ulang per pesan
+        self._oaep = PKCS1_OAEP.new(self.key)
+    
     def get_public_key(self):
 
         if not self.key:
             self.generate_key()
-        return self.key.publickey().export_key().decode('utf-8')
+        if 'public' not in self._pem:
+            self._pem['public'] = self.key.publickey().export_key().decode('utf-8')
+        return self._pem['public']
     
     def get_private_key(self):
 
         if not self.key:
             self.generate_key()
-        return self.key.export_key().decode('utf-8')
+        if 'private' not in self._pem:
+            self._pem['private'] = self.key.export_key().decode('utf-8')
+        return self._pem['private']
     
     def encrypt_text(self, plaintext):
 
-        # Buat kunci sesi untuk AES
-        session_key = get_random_bytes(16)
+        # Data yang sudah berupa bytes langsung dienkripsi tanpa encode ulang
+        if not isinstance(plaintext, (bytes, bytearray, memoryview)):
+            plaintext = plaintext.encode('utf-8')
+        encrypted_data, encrypted_session_key = self.encrypt_bytes(plaintext)
         
-        # Enkripsi session key dengan RSA
-        cipher_rsa = PKCS1_OAEP.new(self.key.publickey())
-        encrypted_session_key = cipher_rsa.encrypt(session_key)
+        # Konversi ke base64 untuk kemudahan penanganan
+        encrypted_data_base64 = b2a_base64(encrypted_data, newline=False).decode('ascii')
+        encrypted_session_key_base64 = b2a_base64(encrypted_session_key, newline=False).decode('ascii')
         
-        # Enkripsi pesan dengan AES
-        cipher_aes = AES.new(session_key, AES.MODE_CBC)
-        ciphertext = cipher_aes.encrypt(pad(plaintext.encode('utf-8'), AES.block_size))
+        return encrypted_data_base64, encrypted_session_key_base64
+    
+    def encrypt_bytes(self, data):
+
+        # Buat kunci sesi untuk AES
+        session_key = os.urandom(16)
         
-        # Gabungkan IV dan ciphertext
-        encrypted_data = cipher_aes.iv + ciphertext
+        # Enkripsi session key dengan RSA
+        encrypted_session_key = self._oaep.encrypt(session_key)
         
-        # Konversi ke base64 untuk kemudahan penanganan
-        encrypted_data_base64 = base64.b64encode(encrypted_data).decode('utf-8')
-        encrypted_session_key_base64 = base64.b64encode(encrypted_session_key).decode('utf-8')
+        # Enkripsi pesan dengan AES-GCM (terautentikasi, tanpa padding).
+        encrypted_data = gcm_encrypt(session_key, data)
         
-        return encrypted_data_base64, encrypted_session_key_base64
+        return encrypted_data, encrypted_session_key
+    
+    def encrypt_many(self, plaintexts):
+
+        return [self.encrypt_text(plaintext) for plaintext in plaintexts]
     
     def load_key(self, key_str, is_private=True):
 
+        # Cek header PEM lebih dulu: kunci publik yang diberikan saat kunci privat
+        # diperlukan langsung ditolak tanpa parsing DER/ASN.1 penuh
+        header = key_str.lstrip()[:40]
+        if is_private and (b'PUBLIC' if isinstance(header, bytes) else 'PUBLIC') in header:
+            _log.warning("Error saat memuat kunci: kunci publik diberikan, kunci privat diperlukan")
+            return False
+        
         try:
-            if is_private:
-                self.key = RSA.import_key(key_str)
-            else:
-                self.key = RSA.import_key(key_str)
+            self.key = RSA.import_key(key_str)
+            self._key_changed()
             return True
         except Exception as e:
-            print(f"Error saat memuat kunci: {str(e)}")
+            _log.warning("Error saat memuat kunci: %s", e)
             return False
     
     def decrypt_text(self, encrypted_data_base64, encrypted_session_key_base64):
 
         try:
             # Dekode dari base64
-            encrypted_data = base64.b64decode(encrypted_data_base64)
-            encrypted_session_key = base64.b64decode(encrypted_session_key_base64)
+            encrypted_data = a2b_base64(encrypted_data_base64)
+            encrypted_session_key = a2b_base64(encrypted_session_key_base64)
             
-            # Dekripsi kunci sesi dengan RSA
-            cipher_rsa = PKCS1_OAEP.new(self.key)
-            try:
-                session_key = cipher_rsa.decrypt(encrypted_session_key)
-            except ValueError as e:
-                if "Incorrect decryption" in str(e):
-                    print("[DEBUG] RSA: Dekripsi kunci sesi gagal - kunci tidak cocok")
-                    raise ValueError("Kunci RSA tidak cocok untuk dekripsi") from e
-                else:
-                    print(f"[DEBUG] RSA: Error dekripsi tidak dikenal: {str(e)}")
-                    raise
-            
-            # Pisahkan IV dan ciphertext
-            iv = encrypted_data[:16]
-            ciphertext = encrypted_data[16:]
-            
-            # Dekripsi pesan dengan AES
-            cipher_aes = AES.new(session_key, AES.MODE_CBC, iv)
-            try:
-                plaintext = unpad(cipher_aes.decrypt(ciphertext), AES.block_size)
-                return plaintext.decode('utf-8')
-            except ValueError as e:
-                if "padding is incorrect" in str(e):
-                    print("[DEBUG] AES: Padding tidak valid - kemungkinan data rusak")
-                    raise ValueError("Padding AES tidak valid, data mungkin rusak") from e
-                else:
-                    print(f"[DEBUG] AES: Error dekripsi: {str(e)}")
-                    raise
+            return self.decrypt_bytes(encrypted_data, encrypted_session_key).decode('utf-8')
         except Exception as e:
-            print(f"[DEBUG] Dekripsi gagal: {type(e).__name__}: {str(e)}")
+            _log.debug("Dekripsi gagal: %s: %s", type(e).__name__, e)
             raise
     
+    def decrypt_bytes(self, encrypted_data, encrypted_session_key):
+
+        if self._oaep is None or not self.key.has_private():
+            raise ValueError("Kunci privat RSA tidak tersedia untuk dekripsi")
+        
+        # Dekripsi kunci sesi dengan RSA
+        try:
+            session_key = self._oaep.decrypt(encrypted_session_key)
+        except ValueError as e:
+            if "Incorrect decryption" in str(e):
+                _log.debug("RSA: Dekripsi kunci sesi gagal - kunci tidak cocok")
+                raise ValueError("Kunci RSA tidak cocok untuk dekripsi") from e
+            else:
+                _log.debug("RSA: Error dekripsi tidak dikenal: %s", e)
+                raise
+        
+        # Dekripsi pesan dengan AES-GCM sekaligus verifikasi tag
+        try:
+            return gcm_decrypt(session_key, encrypted_data)
+        except ValueError as e:
+            if "MAC check failed" in str(e):
+                _log.debug("AES: Tag GCM tidak valid - kemungkinan data rusak")
+                raise ValueError("Tag AES-GCM tidak valid, data mungkin rusak") from e
+            else:
+                _log.debug("AES: Error dekripsi: %s", e)
+                raise
+    
+    def decrypt_many(self, pairs, workers=None):
+
+        # Tiap dekripsi adalah modexp CRT independen yang berjalan di kode C PyCryptodome
+        # tanpa GIL, sehingga thread bisa mengerjakannya paralel dengan objek OAEP yang sama
+        pairs = list(pairs)
+        if len(pairs) < 2:
+            return [self.decrypt_text(data, key) for data, key in pairs]
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            return list(executor.map(lambda pair: self.decrypt_text(*pair), pairs))
+    
     def hash_message(self, message):
 
-        if isinstance(message, str):
-            message = message.encode('utf-8')
-        return hashlib.sha256(message).hexdigest() 
\ No newline at end of file
+        return sha256_hex(message) 
\ No newline at end of file
@@ -1,31 +1,85 @@
 # src/gui.py
 import sys
 import os
-import time
+import io
+import binascii
+import subprocess
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+from PIL import Image
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, 
                             QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
                             QTextEdit, QFileDialog, QProgressBar, QRadioButton, 
                             QGroupBox, QLineEdit, QMessageBox, QDoubleSpinBox)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QIcon, QPixmap
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QIcon, QPixmap, QTextCursor
 
-from core import embed_message, extract_message
+from core import embed_message, extract_message, generate_audio
+from utils.metrics import generate_quality_report, analyze_security as analyze_sec
 
-class WorkerThread(QThread):
-    """Worker thread for long-running tasks to keep the UI responsive"""
+# Static About tab content, built once at import instead of per window
+_APP_TITLE = "Audio Steganography with ECC, RSA and DWT"
+
+_ABOUT_DESC = (
+    "This application allows you to hide secret messages or images "
+    "inside audio files using a combination of Discrete Wavelet Transform (DWT) "
+    "for steganography and hybrid encryption with ECC and RSA for security."
+)
+
+_FEATURES_TEXT = (
+    "• Hide text messages in audio files\n"
+    "• Hide image files in audio files\n"
+    "• Double-layer encryption using ECC and RSA\n"
+    "• Adjustable DWT parameters for optimal hiding\n"
+    "• Extract hidden messages from stego files\n"
+    "• Generate sample audio for testing"
+)
+
+_TECH_TEXT = (
+    "This application uses the following technologies:\n\n"
+    "• DWT (Discrete Wavelet Transform) for embedding data in frequency domain\n"
+    "• ECC (Elliptic Curve Cryptography) for key exchange\n"
+    "• RSA for asymmetric encryption of messages\n"
+    "• PyQt6 for the graphical user interface\n"
+    "• Base64 encoding for handling binary data"
+)
+
+# Magic numbers of the image formats PIL can reopen from an extracted payload
+_IMAGE_MAGIC = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'BM')
+
+
+def _looks_like_image(message):
+    """Return True if the message is a data URI or base64 of a known image format"""
+    if message.startswith("data:image"):
+        return True
+    try:
+        # 12 base64 characters decode to the first 9 bytes of the payload
+        head = binascii.a2b_base64(message[:12])
+    except (binascii.Error, ValueError):
+        return False
+    return head.startswith(_IMAGE_MAGIC)
+
+class WorkerSignals(QObject):
+    """Signals of a Worker; QRunnable is not a QObject and cannot emit them itself"""
     progress = pyqtSignal(int)
     message = pyqtSignal(str)
     result = pyqtSignal(dict)
     error = pyqtSignal(str)
+
+class Worker(QRunnable):
+    """Long-running task executed on the shared QThreadPool to keep the UI responsive"""
     
     def __init__(self, task, **kwargs):
         super().__init__()
         self.task = task
         self.kwargs = kwargs
+        self.signals = WorkerSignals()
     
     def run(self):
         try:
-            self.message.emit("Processing...")
+            self.signals.message.emit("Processing...")
             # Execute the task
             if self.task == "embed":
                 output_file = embed_message(
@@ -33,21 +87,33 @@ class WorkerThread(QThread):
                     output_file=self.kwargs.get('output_file'),
                     message=self.kwargs.get('message'),
                     alpha=self.kwargs.get('alpha', 0.001),
-                    is_image=self.kwargs.get('is_image', False)
+                    kind=self.kwargs.get('kind', 'text'),
+                    progress_callback=lambda fraction: self.signals.progress.emit(int(fraction * 100))
                 )
-                self.result.emit({"status": "success", "output_file": output_file})
+                self.signals.result.emit({"status": "success", "output_file": output_file})
             
             elif self.task == "extract":
                 extracted_message = extract_message(self.kwargs.get('stego_file'))
-                self.result.emit({"status": "success", "message": extracted_message})
+                self.signals.result.emit({"status": "success", "message": extracted_message})
+            
+            elif self.task == "quality":
+                metrics = generate_quality_report(self.kwargs.get('original_file'), self.kwargs.get('stego_file'))
+                self.signals.result.emit({"status": "success", "metrics": metrics})
+            
+            elif self.task == "security":
+                metrics = analyze_sec(self.kwargs.get('message'))
+                self.signals.result.emit({"status": "success", "metrics": metrics})
                 
         except Exception as e:
-            self.error.emit(f"Error: {str(e)}")
+            self.signals.error.emit(f"Error: {str(e)}")
 
 class AudioStegoGUI(QMainWindow):
+    # Shared title font, created on first use (QFont needs a running QApplication)
+    _title_font = None
+    
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Audio Steganography with ECC, RSA and DWT")
+        self.setWindowTitle(_APP_TITLE)
         self.setGeometry(100, 100, 800, 600)
         
         # Main widget and layout
@@ -69,11 +135,11 @@ class AudioStegoGUI(QMainWindow):
         
         self.layout.addWidget(self.tabs)
         
-        # Setup each tab
+        # Setup each tab; the analysis and about tabs are built after the first paint
         self.setup_embed_tab()
         self.setup_extract_tab()
-        self.setup_analysis_tab()  # Setup the analysis tab
-        self.setup_about_tab()
+        QTimer.singleShot(0, self.setup_analysis_tab)
+        QTimer.singleShot(0, self.setup_about_tab)
         
         # Store report file path
         self.current_report_path = None
@@ -241,16 +307,14 @@ class AudioStegoGUI(QMainWindow):
         layout.setSpacing(15)
         
         # Main title
-        title = QLabel("Audio Steganography with ECC, RSA and DWT")
-        title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        if AudioStegoGUI._title_font is None:
+            AudioStegoGUI._title_font = QFont("Arial", 16, QFont.Weight.Bold)
+        title = QLabel(_APP_TITLE)
+        title.setFont(AudioStegoGUI._title_font)
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         # Description
-        desc = QLabel(
-            "This application allows you to hide secret messages or images "
-            "inside audio files using a combination of Discrete Wavelet Transform (DWT) "
-            "for steganography and hybrid encryption with ECC and RSA for security."
-        )
+        desc = QLabel(_ABOUT_DESC)
         desc.setWordWrap(True)
         desc.setAlignment(Qt.AlignmentFlag.AlignJustify)
         desc.setFixedHeight(80)
@@ -259,14 +323,7 @@ class AudioStegoGUI(QMainWindow):
         features_group = QGroupBox("Features")
         features_layout = QVBoxLayout(features_group)
         
-        features_text = QLabel(
-            "• Hide text messages in audio files\n"
-            "• Hide image files in audio files\n"
-            "• Double-layer encryption using ECC and RSA\n"
-            "• Adjustable DWT parameters for optimal hiding\n"
-            "• Extract hidden messages from stego files\n"
-            "• Generate sample audio for testing"
-        )
+        features_text = QLabel(_FEATURES_TEXT)
         features_text.setAlignment(Qt.AlignmentFlag.AlignLeft)
         features_layout.addWidget(features_text)
         
@@ -274,14 +331,7 @@ class AudioStegoGUI(QMainWindow):
         tech_group = QGroupBox("Technical Details")
         tech_layout = QVBoxLayout(tech_group)
         
-        tech_text = QLabel(
-            "This application uses the following technologies:\n\n"
-            "• DWT (Discrete Wavelet Transform) for embedding data in frequency domain\n"
-            "• ECC (Elliptic Curve Cryptography) for key exchange\n"
-            "• RSA for asymmetric encryption of messages\n"
-            "• PyQt6 for the graphical user interface\n"
-            "• Base64 encoding for handling binary data"
-        )
+        tech_text = QLabel(_TECH_TEXT)
         tech_text.setWordWrap(True)
         tech_text.setAlignment(Qt.AlignmentFlag.AlignLeft)
         tech_layout.addWidget(tech_text)
@@ -425,7 +475,6 @@ class AudioStegoGUI(QMainWindow):
     
     def generate_sample_audio(self):
         # Default path for sample audio
-        from core import generate_audio
         output_path = 'output/sample.wav'
         os.makedirs('output', exist_ok=True)
         
@@ -438,18 +487,31 @@ class AudioStegoGUI(QMainWindow):
         """Add message to the log text box"""
         self.log_text.append(message)
     
+    def log_messages(self, lines):
+        """Add several lines to the log text box with a single layout pass"""
+        text = "\n".join(lines)
+        if not self.log_text.document().isEmpty():
+            text = "\n" + text
+        self.log_text.setUpdatesEnabled(False)
+        cursor = self.log_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.log_text.setTextCursor(cursor)
+        self.log_text.setUpdatesEnabled(True)
+        self.log_text.ensureCursorVisible()
+    
     def start_embed(self):
         """Start the embed process in a separate thread"""
         # Validate inputs
         if self.text_radio.isChecked():
             message = self.message_text.toPlainText()
-            is_image = False
+            kind = 'text'
             if not message:
                 QMessageBox.warning(self, "Warning", "Please enter a message.")
                 return
         else:
             message = self.image_path.text()
-            is_image = True
+            kind = 'image'
             if not message or not os.path.exists(message):
                 QMessageBox.warning(self, "Warning", "Please select a valid image file.")
                 return
@@ -458,31 +520,26 @@ class AudioStegoGUI(QMainWindow):
         output_file = self.output_file_path.text() if self.output_file_path.text() else None
         alpha = self.alpha_value.value()
         
-        # Disable the button and show progress
+        # Disable the button and show a busy indicator until the first real progress tick
         self.embed_button.setEnabled(False)
-        self.embed_progress.setValue(0)
+        self.embed_progress.setRange(0, 0)
         self.log_text.clear()
         self.log_text.append("Starting embed process...")
         
-        # Create and start the worker thread
-        self.worker = WorkerThread(
+        # Create the worker and submit it to the shared thread pool
+        worker = Worker(
             "embed", 
             input_file=input_file,
             output_file=output_file,
             message=message,
             alpha=alpha,
-            is_image=is_image
+            kind=kind
         )
-        self.worker.message.connect(self.log_message)
-        self.worker.error.connect(self.handle_error)
-        self.worker.result.connect(self.handle_embed_result)
-        self.worker.start()
-        
-        # Simulate progress
-        for i in range(101):
-            self.embed_progress.setValue(i)
-            QApplication.processEvents()
-            time.sleep(0.03)
+        worker.signals.message.connect(self.log_message)
+        worker.signals.progress.connect(lambda value: self.update_progress(self.embed_progress, value))
+        worker.signals.error.connect(self.handle_error)
+        worker.signals.result.connect(self.handle_embed_result)
+        QThreadPool.globalInstance().start(worker)
     
     def start_extract(self):
         """Start the extract process in a separate thread"""
@@ -492,32 +549,35 @@ class AudioStegoGUI(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select a valid stego audio file.")
             return
         
-        # Disable the button and show progress
+        # Disable the button and show a busy indicator while extracting
         self.extract_button.setEnabled(False)
-        self.extract_progress.setValue(0)
+        self.extract_progress.setRange(0, 0)
         self.extracted_message.clear()
         
-        # Create and start the worker thread
-        self.worker = WorkerThread("extract", stego_file=stego_file)
-        self.worker.result.connect(self.handle_extract_result)
-        self.worker.error.connect(self.handle_error)
-        self.worker.start()
-        
-        # Simulate progress
-        for i in range(101):
-            self.extract_progress.setValue(i)
-            QApplication.processEvents()
-            time.sleep(0.03)
+        # Create the worker and submit it to the shared thread pool
+        worker = Worker("extract", stego_file=stego_file)
+        worker.signals.result.connect(self.handle_extract_result)
+        worker.signals.error.connect(self.handle_error)
+        QThreadPool.globalInstance().start(worker)
+    
+    def update_progress(self, progress_bar, value):
+        """Leave the busy state on the first progress tick and show the value"""
+        if progress_bar.maximum() == 0:
+            progress_bar.setRange(0, 100)
+        progress_bar.setValue(value)
     
     def handle_embed_result(self, result):
         """Handle the result from the embed thread"""
+        self.update_progress(self.embed_progress, 100)
         if result["status"] == "success":
             output_file = result["output_file"]
             
             if output_file:
-                self.log_message(f"Message successfully embedded in: {output_file}")
-                self.log_message(f"Keys saved in: {output_file}.key")
-                self.log_message(f"Additional info: {output_file}.info")
+                self.log_messages([
+                    f"Message successfully embedded in: {output_file}",
+                    f"Keys saved in: {output_file}.key",
+                    f"Additional info: {output_file}.info",
+                ])
                 
                 QMessageBox.information(
                     self, 
@@ -531,16 +591,13 @@ class AudioStegoGUI(QMainWindow):
     
     def handle_extract_result(self, result):
         """Handle the result from the extract thread"""
+        self.update_progress(self.extract_progress, 100)
         if result["status"] == "success":
             extracted_message = result["message"]
             
             if extracted_message:
                 # Check if it might be base64-encoded image
-                if extracted_message.startswith("data:image") or (
-                    len(extracted_message) > 100 and 
-                    all(c in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=" 
-                        for c in extracted_message[:100])
-                ):
+                if _looks_like_image(extracted_message):
                     self.extracted_message.setPlainText("[The extracted data appears to be an image]")
                     
                     # Ask if user wants to save the image
@@ -563,20 +620,19 @@ class AudioStegoGUI(QMainWindow):
     def save_extracted_image(self, base64_data):
         """Save the extracted base64 image to a file"""
         try:
-            import base64
-            from PIL import Image
-            import io
-            
             # Handle different base64 formats
             if base64_data.startswith("data:image"):
-                # Extract the actual base64 data
-                base64_data = base64_data.split(",")[1]
+                # Skip the data URI prefix by slicing instead of splitting the whole payload
+                base64_data = base64_data[base64_data.find(",") + 1:]
             
-            # Decode the base64 data
+            # Decode the base64 data; BytesIO shares the decoded buffer instead of copying it
             image_data = base64.b64decode(base64_data)
             
-            # Create an image from the raw data
-            image = Image.open(io.BytesIO(image_data))
+            # Create an image from the raw data and decode it now so the buffer can be freed
+            with io.BytesIO(image_data) as buffer:
+                image = Image.open(buffer)
+                image.load()
+            del image_data
             
             # Ask user where to save the image
             file_path, _ = QFileDialog.getSaveFileName(
@@ -603,13 +659,18 @@ class AudioStegoGUI(QMainWindow):
     def handle_error(self, error_message):
         """Handle error from the worker thread"""
         self.log_message(error_message)
+        self.update_progress(self.embed_progress, 0)
+        self.update_progress(self.extract_progress, 0)
         self.embed_button.setEnabled(True)
         self.extract_button.setEnabled(True)
         QMessageBox.warning(self, "Error", error_message)
 
+    def set_analysis_running(self, running):
+        """Disable the analysis buttons while an analysis runs to prevent double submits"""
+        self.quality_button.setEnabled(not running)
+        self.security_button.setEnabled(not running)
+    
     def analyze_audio_quality(self):
-        from utils.metrics import generate_quality_report
-        
         original_file = self.original_file_path.text()
         stego_file = self.stego_analysis_file_path.text()
         
@@ -621,12 +682,21 @@ class AudioStegoGUI(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please select a valid stego audio file.")
             return
         
-        try:
-            self.results_text.clear()
-            self.results_text.append("Analyzing audio quality...")
-            
-            # Generate quality report
-            metrics = generate_quality_report(original_file, stego_file)
+        self.results_text.clear()
+        self.results_text.append("Analyzing audio quality...")
+        self.set_analysis_running(True)
+        
+        # Generate the quality report on the thread pool so the window keeps rendering
+        worker = Worker("quality", original_file=original_file, stego_file=stego_file)
+        worker.signals.result.connect(self.handle_quality_result)
+        worker.signals.error.connect(self.handle_analysis_error)
+        QThreadPool.globalInstance().start(worker)
+    
+    def handle_quality_result(self, result):
+        """Display the metrics from the quality analysis worker"""
+        self.set_analysis_running(False)
+        if result["status"] == "success":
+            metrics = result["metrics"]
             
             # Display results
             self.results_text.append(f"\nQuality Metrics:")
@@ -638,26 +708,29 @@ class AudioStegoGUI(QMainWindow):
             # Enable view report button
             self.current_report_path = metrics['report_file']
             self.view_report_button.setEnabled(True)
-            
-        except Exception as e:
-            self.results_text.append(f"\nError: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Analysis failed: {str(e)}")
 
     def analyze_security(self):
-        from utils.metrics import analyze_security as analyze_sec
-        
         message = self.security_message.text()
         
         if not message:
             QMessageBox.warning(self, "Warning", "Please enter a message for security analysis.")
             return
         
-        try:
-            self.results_text.clear()
-            self.results_text.append("Analyzing security metrics...")
-            
-            # Generate security analysis
-            metrics = analyze_sec(message)
+        self.results_text.clear()
+        self.results_text.append("Analyzing security metrics...")
+        self.set_analysis_running(True)
+        
+        # Run the security analysis on the thread pool so the window keeps rendering
+        worker = Worker("security", message=message)
+        worker.signals.result.connect(self.handle_security_result)
+        worker.signals.error.connect(self.handle_analysis_error)
+        QThreadPool.globalInstance().start(worker)
+    
+    def handle_security_result(self, result):
+        """Display the metrics from the security analysis worker"""
+        self.set_analysis_running(False)
+        if result["status"] == "success":
+            metrics = result["metrics"]
             
             # Display results
             self.results_text.append(f"\nSecurity Metrics:")
@@ -672,23 +745,22 @@ class AudioStegoGUI(QMainWindow):
                 self.view_report_button.setEnabled(True)
             else:
                 self.view_report_button.setEnabled(False)
-            
-        except Exception as e:
-            self.results_text.append(f"\nError: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Analysis failed: {str(e)}")
+    
+    def handle_analysis_error(self, error_message):
+        """Handle error from an analysis worker"""
+        self.set_analysis_running(False)
+        self.results_text.append(f"\n{error_message}")
+        QMessageBox.warning(self, "Error", f"Analysis failed: {error_message}")
 
     def view_report(self):
         if self.current_report_path and os.path.exists(self.current_report_path):
-            # Open the report using the default system application
-            import subprocess
-            import sys
-            
+            # Open the report using the default system application without waiting for the viewer
             if sys.platform.startswith('darwin'):  # macOS
-                subprocess.call(('open', self.current_report_path))
+                subprocess.Popen(['open', self.current_report_path], start_new_session=True)
             elif sys.platform.startswith('win'):  # Windows
                 os.startfile(self.current_report_path)
             else:  # Linux
-                subprocess.call(('xdg-open', self.current_report_path))
+                subprocess.Popen(['xdg-open', self.current_report_path], start_new_session=True)
         else:
             QMessageBox.warning(self, "Error", "Report file not found.")
 
@@ -1,20 +1,68 @@
+import os
 import numpy as np
 import pywt
 import soundfile as sf
 from scipy import signal
 
+from .kernels import qim_embed
+
+
+def _as_bit_array(bits):
+    # String '0'/'1' lama tetap diterima (sama seperti utils.bits_to_bytes),
+    # dikonversi tanpa loop Python; selain itu dianggap array/list bit 0/1
+    if isinstance(bits, str):
+        return np.frombuffer(bits.encode('ascii'), dtype=np.uint8) - ord('0')
+    return np.asarray(bits, dtype=np.uint8)
+
 class AudioDWT:
     def __init__(self, wavelet='db1', level=1):
         self.wavelet = wavelet
         self.level = level
     
-    def read_audio(self, file_path):
-        data, sample_rate = sf.read(file_path)
+    def read_audio(self, file_path, frames=-1):
+        # float32 sudah cukup presisi untuk PCM dan memangkas lalu lintas memori separuhnya
+        data, sample_rate = sf.read(file_path, frames=frames, dtype='float32')
         return data, sample_rate
     
     def save_audio(self, file_path, data, sample_rate):
         sf.write(file_path, data, sample_rate)
     
+    def save_audio_with_tail(self, file_path, head, sample_rate, source_path, blocksize=1 << 16):
+        # Tulis bagian awal yang dimodifikasi, lalu salin sisa file sumber per blok
+        # sehingga file audio panjang tidak pernah dimuat utuh ke memori
+        root, ext = os.path.splitext(file_path)
+        tmp_path = root + ".tmp" + ext
+        try:
+            with sf.SoundFile(source_path) as src:
+                with sf.SoundFile(tmp_path, 'w', samplerate=sample_rate, channels=src.channels) as dst:
+                    dst.write(head)
+                    src.seek(len(head))
+                    for block in src.blocks(blocksize=blocksize, dtype='float32'):
+                        dst.write(block)
+            # File output bisa sama dengan file sumber, ganti setelah penulisan selesai
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            # Jangan tinggalkan file .tmp setengah jadi di samping output
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def prefix_frames(self, num_bits):
+        # Jumlah sampel awal yang cukup agar num_bits koefisien detail pertama
+        # identik dengan hasil DWT seluruh file (filter hanya menjangkau beberapa tap)
+        filter_len = pywt.Wavelet(self.wavelet).dec_len
+        return (num_bits + filter_len) * 2 ** self.level
+    
+    def detail_capacity(self, num_samples):
+        # Panjang coeffs[1] (kapasitas bit) dihitung tanpa menjalankan DWT
+        filter_len = pywt.Wavelet(self.wavelet).dec_len
+        length = num_samples
+        for _ in range(self.level):
+            length = pywt.dwt_coeff_len(length, filter_len, 'symmetric')
+        return length
+    
     def apply_dwt(self, audio_data):
         # Jika data stereo, ambil salah satu channel (misalnya channel pertama)
         if len(audio_data.shape) > 1 and audio_data.shape[1] > 1:
@@ -31,38 +79,42 @@ class AudioDWT:
         reconstructed_data = pywt.waverec(coeffs, self.wavelet)
         return reconstructed_data
     
-    def embed_bits_in_coefficients(self, coeffs, bits, alpha=0.001):
-        # Modifikasi koefisien detail (level 1)
-        detail_coeffs = coeffs[1].copy()  # Buat salinan koefisien untuk mencegah modifikasi langsung
+    def embed_bits_in_coefficients(self, coeffs, bits, alpha=0.001, progress_callback=None, copy=True):
+        # Modifikasi koefisien detail (level 1). Salin agar koefisien pemanggil tidak berubah,
+        # kecuali pemanggil memiliki koefisien tersebut dan meminta copy=False (in-place)
+        detail_coeffs = coeffs[1].copy() if copy else coeffs[1]
         modified_coeffs = list(coeffs.copy())  # Konversi ke list untuk memudahkan manipulasi
         
+        bits = _as_bit_array(bits)
+        
         # Pastikan ada cukup koefisien untuk menyisipkan seluruh bit
         if len(bits) > len(detail_coeffs):
             raise ValueError(f"Pesan terlalu panjang untuk disisipkan. Maksimal {len(detail_coeffs)} bit")
         
-        # Sisipkan bit dalam koefisien detail
-        for i in range(len(bits)):
-            if i >= len(detail_coeffs):
-                break
-            
-            # Dapatkan nilai absolute dari koefisien
-            coeff_abs = abs(detail_coeffs[i])
-            
-            # Hitung remainder saat ini
-            remainder = coeff_abs % (2 * alpha)
+        # Target remainder: tepat di tengah range (alpha) untuk bit 1, tepat 0 untuk bit 0
+        target_remainder = bits * alpha
+        
+        # Proses per blok 1% bit agar progres tetap bisa dilaporkan
+        progress_step = max(1, len(bits) // 100)
+        
+        for start in range(0, len(bits), progress_step):
+            stop = min(start + progress_step, len(bits))
+            segment = detail_coeffs[start:stop]
             
-            # Tentukan target remainder berdasarkan bit
-            if bits[i] == '1':
-                target_remainder = alpha  # Tepat di tengah range untuk bit 1
+            if qim_embed is not None:
+                # Kernel numba mengerjakan langkah di bawah dalam satu loop terkompilasi
+                qim_embed(segment, target_remainder[start:stop], 2 * alpha)
             else:
-                target_remainder = 0  # Tepat pada 0 untuk bit 0
+                # Dapatkan nilai absolute dan remainder saat ini
+                coeff_abs = np.abs(segment)
+                remainder = coeff_abs % (2 * alpha)
+                
+                # Terapkan penyesuaian ke koefisien asli dengan tanda semula
+                adjusted = coeff_abs + (target_remainder[start:stop] - remainder)
+                segment[:] = np.where(segment >= 0, adjusted, -adjusted)
             
-            # Hitung penyesuaian yang diperlukan
-            adjustment = target_remainder - remainder
-            
-            # Terapkan penyesuaian ke koefisien asli
-            sign = 1 if detail_coeffs[i] >= 0 else -1
-            detail_coeffs[i] = sign * (coeff_abs + adjustment)
+            if progress_callback is not None:
+                progress_callback(stop / len(bits))
         
         # Perbarui koefisien yang telah dimodifikasi
         modified_coeffs[1] = detail_coeffs
@@ -72,7 +124,6 @@ class AudioDWT:
     def extract_bits_from_coefficients(self, coeffs, num_bits, alpha=0.001):
         # Koefisien detail (level 1)
         detail_coeffs = coeffs[1]
-        extracted_bits = ""
         
         # Pastikan kita tidak mencoba mengekstrak lebih banyak bit daripada yang tersedia
         max_bits = min(num_bits, len(detail_coeffs))
@@ -82,38 +133,22 @@ class AudioDWT:
         threshold_high = 1.6 * alpha
         
         # Ekstrak bit dari koefisien detail
-        for i in range(max_bits):
-            coeff_value = abs(detail_coeffs[i])
-            remainder = coeff_value % (2 * alpha)
-            
-            # Range yang lebih lebar untuk mendeteksi bit 1
-            if remainder >= threshold_low and remainder <= threshold_high:
-                extracted_bits += "1"
-            else:
-                extracted_bits += "0"
+        remainder = np.abs(detail_coeffs[:max_bits]) % (2 * alpha)
+        
+        # Range yang lebih lebar untuk mendeteksi bit 1
+        extracted_bits = (remainder >= threshold_low) & (remainder <= threshold_high)
         
-        return extracted_bits
+        # Hasil berupa array uint8 berisi 0/1 (dulu string '0'/'1');
+        # pakai ''.join(map(str, bits)) bila masih butuh bentuk string
+        return extracted_bits.astype(np.uint8)
     
     def bits_to_bytes(self, bits):
-        # Pastikan panjang bit adalah kelipatan 8
-        padded_bits = bits
-        if len(bits) % 8 != 0:
-            padded_bits = bits + "0" * (8 - (len(bits) % 8))
-        
-        # Konversi setiap 8 bit ke byte
-        bytes_data = bytearray()
-        for i in range(0, len(padded_bits), 8):
-            byte = padded_bits[i:i+8]
-            bytes_data.append(int(byte, 2))
-        
-        return bytes(bytes_data)
+        # np.packbits otomatis menambahkan 0 hingga kelipatan 8
+        return np.packbits(_as_bit_array(bits)).tobytes()
     
     def bytes_to_bits(self, data):
-        bits = ""
-        for byte in data:
-            bits += bin(byte)[2:].zfill(8)  # Hilangkan '0b' di awal dan tambahkan 0 hingga 8 bit
-        
-        return bits
+        # Hasil berupa array uint8 berisi 0/1 (dulu string '0'/'1')
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
     
     def embed_data(self, audio_path, output_path, data_bits):
 
@@ -130,15 +165,12 @@ class AudioDWT:
         reconstructed_data = self.apply_idwt(modified_coeffs)
         
         # Jika audio original stereo, buat hasil rekonstruksi juga stereo
-        if len(audio_data.shape) > 1 and audio_data.shape[1] > 1:
+        if audio_data.ndim > 1 and audio_data.shape[1] > 1:
             # Potong jika ukuran berbeda (seharusnya hampir sama)
             min_len = min(len(reconstructed_data), len(audio_data))
-            reconstructed_stereo = np.zeros((min_len, audio_data.shape[1]))
-            reconstructed_stereo[:, 0] = reconstructed_data[:min_len]
-            # Salin channel lain dari audio asli
-            for ch in range(1, audio_data.shape[1]):
-                reconstructed_stereo[:, ch] = audio_data[:min_len, ch]
-            reconstructed_data = reconstructed_stereo
+            # Channel lain tetap dari audio asli, cukup timpa channel pertama
+            audio_data[:min_len, 0] = reconstructed_data[:min_len]
+            reconstructed_data = audio_data[:min_len]
         
         # Simpan audio hasil
         self.save_audio(output_path, reconstructed_data, sample_rate)
@@ -0,0 +1,20 @@
+# Numba opsional: tanpa numba, AudioDWT memakai jalur NumPy biasa
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def qim_embed(detail_coeffs, target_remainder, modulus):
+        # Satu lintasan tanpa array sementara (abs, remainder, where) per blok.
+        # nogil: thread GUI tetap berjalan selama worker menyisipkan bit.
+        # Aturan sama dengan jalur NumPy: remainder |c| % modulus dipindah ke target.
+        for i in range(target_remainder.size):
+            coeff = detail_coeffs[i]
+            coeff_abs = abs(coeff)
+            adjusted = coeff_abs + (target_remainder[i] - coeff_abs % modulus)
+            detail_coeffs[i] = adjusted if coeff >= 0 else -adjusted
+else:
+    qim_embed = None
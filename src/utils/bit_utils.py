@@ -1,31 +1,23 @@
+import numpy as np
+
+
 def text_to_bits(text):
 
-    bits = ""
-    for char in text:
-        bits += format(ord(char), '08b')  
-    return bits
+    return bytes_to_bits(text.encode('utf-8'))
 
 def bits_to_text(bits):
-  
-    text = ""
-    for i in range(0, len(bits), 8):
-        if i + 8 <= len(bits):
-            byte = bits[i:i+8]
-            text += chr(int(byte, 2))
-    return text
+
+    return bits_to_bytes(bits).decode('utf-8', errors='replace')
 
 def bytes_to_bits(data):
- 
-    bits = ""
-    for byte in data:
-        bits += format(byte, '08b')
-    return bits
+
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
 
 def bits_to_bytes(bits):
 
-    bytes_data = bytearray()
-    for i in range(0, len(bits), 8):
-        if i + 8 <= len(bits):
-            byte = bits[i:i+8]
-            bytes_data.append(int(byte, 2))
-    return bytes(bytes_data)
\ No newline at end of file
+    # String '0'/'1' lama tetap diterima, dikonversi tanpa loop Python
+    if isinstance(bits, str):
+        bits = np.frombuffer(bits.encode('ascii'), dtype=np.uint8) - ord('0')
+    # Abaikan sisa bit yang tidak membentuk satu byte penuh
+    bits = np.asarray(bits, dtype=np.uint8)
+    return np.packbits(bits[:len(bits) - len(bits) % 8]).tobytes()
@@ -2,7 +2,7 @@
 import numpy as np
 import soundfile as sf
 from scipy import signal
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from skimage.metrics import structural_similarity as ssim
 import hashlib
 import os
@@ -122,15 +122,12 @@ def calculate_avalanche_effect(message1, message2=None):
     hash1 = hashlib.sha256(message1.encode() if isinstance(message1, str) else message1).digest()
     hash2 = hashlib.sha256(message2.encode() if isinstance(message2, str) else message2).digest()
     
-    # Convert to binary and count differing bits
-    bin1 = ''.join(format(byte, '08b') for byte in hash1)
-    bin2 = ''.join(format(byte, '08b') for byte in hash2)
-    
-    # Count differing bits
-    diff_bits = sum(b1 != b2 for b1, b2 in zip(bin1, bin2))
+    # Count differing bits with a vectorized XOR instead of per-character string loops
+    diff = np.frombuffer(hash1, dtype=np.uint8) ^ np.frombuffer(hash2, dtype=np.uint8)
+    diff_bits = int(np.unpackbits(diff).sum())
     
     # Calculate avalanche effect percentage
-    avalanche_effect = (diff_bits / len(bin1)) * 100
+    avalanche_effect = (diff_bits / (len(hash1) * 8)) * 100
     
     return avalanche_effect
 
@@ -158,8 +155,10 @@ def generate_quality_report(original_file, stego_file, output_dir='output/report
     psnr_value = calculate_psnr(original_data, stego_data)
     ssim_value = calculate_ssim(original_data, stego_data)
     
-    # Generate spectrogram comparison
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    # Generate spectrogram comparison. Figure is used instead of pyplot so the report
+    # can be rendered from a worker thread without touching the GUI backend
+    fig = Figure(figsize=(12, 6))
+    ax1, ax2 = fig.subplots(1, 2)
     
     # Original spectrogram
     f, t, Sxx = signal.spectrogram(np.mean(original_data, axis=1) if len(original_data.shape) > 1 else original_data, 
@@ -178,17 +177,16 @@ def generate_quality_report(original_file, stego_file, output_dir='output/report
     ax2.set_xlabel('Time [sec]')
     
     # Add colorbar
-    plt.colorbar(im, ax=[ax1, ax2], label='Power/Frequency (dB/Hz)')
+    fig.colorbar(im, ax=[ax1, ax2], label='Power/Frequency (dB/Hz)')
     
     # Add metrics to the figure
-    plt.figtext(0.5, 0.01, f'MSE: {mse_value:.6f} | PSNR: {psnr_value:.2f} dB | SSIM: {ssim_value:.6f}', 
+    fig.text(0.5, 0.01, f'MSE: {mse_value:.6f} | PSNR: {psnr_value:.2f} dB | SSIM: {ssim_value:.6f}', 
                 ha='center', fontsize=12, bbox={'facecolor': 'white', 'alpha': 0.8, 'pad': 5})
     
     # Save the figure
     report_file = os.path.join(output_dir, os.path.basename(stego_file).replace('.wav', '_quality_report.png'))
-    plt.tight_layout()
-    plt.savefig(report_file)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(report_file)
     
     # Return metrics
     metrics = {
@@ -234,20 +232,20 @@ def analyze_security(message, output_dir='output/reports'):
     
     # Generate avalanche effect plot if we have multiple values
     if avalanche_values:
-        plt.figure(figsize=(10, 6))
-        plt.bar(range(len(avalanche_values)), avalanche_values)
-        plt.axhline(y=50, color='r', linestyle='-', label='Ideal (50%)')
-        plt.axhline(y=avg_avalanche, color='g', linestyle='--', label=f'Average ({avg_avalanche:.2f}%)')
-        plt.xlabel('Test Case')
-        plt.ylabel('Avalanche Effect (%)')
-        plt.title('Avalanche Effect Analysis')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        ax.bar(range(len(avalanche_values)), avalanche_values)
+        ax.axhline(y=50, color='r', linestyle='-', label='Ideal (50%)')
+        ax.axhline(y=avg_avalanche, color='g', linestyle='--', label=f'Average ({avg_avalanche:.2f}%)')
+        ax.set_xlabel('Test Case')
+        ax.set_ylabel('Avalanche Effect (%)')
+        ax.set_title('Avalanche Effect Analysis')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
         
         report_file = os.path.join(output_dir, 'avalanche_effect_analysis.png')
-        plt.tight_layout()
-        plt.savefig(report_file)
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(report_file)
     else:
         report_file = None
     
@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from crypto import SimplifiedECCCrypto
+
+NIST_CURVES = ('P-192', 'P-224', 'P-256', 'P-384', 'P-521')
+
+
+class TestECCRoundTrip(unittest.TestCase):
+    def test_round_trip_per_curve(self):
+        for curve in NIST_CURVES:
+            with self.subTest(curve=curve):
+                sender = SimplifiedECCCrypto(curve=curve)
+                encrypted_data, ephemeral_public = sender.encrypt_text("pesan rahasia")
+
+                # Penerima dibuat dengan kurva bawaan; kurva harus mengikuti kunci yang dimuat
+                receiver = SimplifiedECCCrypto(key_str=sender.get_private_key())
+                self.assertEqual(receiver.decrypt_text(encrypted_data, ephemeral_public), "pesan rahasia")
+
+    def test_non_nist_curve_rejected(self):
+        for curve in ('Ed25519', 'Curve25519'):
+            with self.subTest(curve=curve):
+                with self.assertRaises(ValueError):
+                    SimplifiedECCCrypto(curve=curve)
+
+    def test_wrong_key_fails(self):
+        encrypted_data, ephemeral_public = SimplifiedECCCrypto().encrypt_text("pesan")
+        with self.assertRaises(ValueError):
+            SimplifiedECCCrypto().decrypt_text(encrypted_data, ephemeral_public)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import base64
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import soundfile as sf
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import core
+
+SAMPLE_RATE = 44100
+
+
+class TestStegoRoundTrip(unittest.TestCase):
+    def setUp(self):
+        # embed_message membuat folder output/ di direktori kerja
+        self._cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        shutil.rmtree(self.tmp)
+
+    def _make_wav(self, name, channels):
+        # Derau PCM_16 dua detik: cukup untuk pesan teks dan gambar kecil
+        rng = np.random.default_rng(0)
+        shape = (2 * SAMPLE_RATE, channels) if channels > 1 else (2 * SAMPLE_RATE,)
+        data = rng.integers(-8000, 8000, size=shape, dtype=np.int16)
+        path = os.path.join(self.tmp, name)
+        sf.write(path, data, SAMPLE_RATE, subtype='PCM_16')
+        return path
+
+    def _make_png(self):
+        path = os.path.join(self.tmp, 'gambar.png')
+        Image.fromarray(np.arange(64, dtype=np.uint8).reshape(8, 8)).save(path)
+        return path
+
+    def _round_trip(self, cover, message, kind):
+        stego = os.path.join(self.tmp, 'stego.wav')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(core.embed_message(cover, stego, message, kind=kind, progress_callback=None), stego)
+            extracted = core.extract_message(stego)
+        return stego, extracted
+
+    def _assert_tail_untouched(self, cover, stego):
+        # Hanya prefiks yang memuat bit pesan diubah; sisa file disalin apa adanya
+        with open(stego + '.info', 'rb') as f:
+            num_bits = json.loads(f.read())['bits_length']
+        prefix = core._get_dwt().prefix_frames(num_bits)
+        source, _ = sf.read(cover, dtype='int16')
+        result, _ = sf.read(stego, dtype='int16')
+        self.assertEqual(source.shape, result.shape)
+        self.assertLess(prefix, len(source))
+        np.testing.assert_array_equal(result[prefix:], source[prefix:])
+        if source.ndim > 1:
+            # Hanya channel pertama yang dipakai untuk DWT
+            np.testing.assert_array_equal(result[:, 1:], source[:, 1:])
+
+    def test_text_round_trip(self):
+        for channels in (1, 2):
+            with self.subTest(channels=channels):
+                cover = self._make_wav(f'cover{channels}.wav', channels)
+                stego, extracted = self._round_trip(cover, "pesan rahasia ✓", 'text')
+                self.assertEqual(extracted, "pesan rahasia ✓")
+                self._assert_tail_untouched(cover, stego)
+
+    def test_image_round_trip(self):
+        image = self._make_png()
+        with open(image, 'rb') as f:
+            expected = f.read()
+        for channels in (1, 2):
+            with self.subTest(channels=channels):
+                cover = self._make_wav(f'cover{channels}.wav', channels)
+                stego, extracted = self._round_trip(cover, image, 'image')
+                self.assertEqual(base64.b64decode(extracted), expected)
+                self._assert_tail_untouched(cover, stego)
+
+    def test_frame_round_trip(self):
+        ecc_crypto = core.SimplifiedECCCrypto()
+        rsa_crypto = core.SimpleRSACrypto()
+        bits = core._frame_message("pesan", ecc_crypto, rsa_crypto, "Y2lwaGVy", "a3VuY2k=", 'hybrid')
+        frame = core._parse_frame(core.bits_to_bytes(bits))
+        self.assertEqual(frame["mode"], 'hybrid')
+        self.assertEqual(frame["message_length"], 5)
+        self.assertEqual(frame["ecc_public_key"], ecc_crypto.get_public_key())
+        self.assertEqual(frame["rsa_public_key"], rsa_crypto.get_public_key())
+        self.assertEqual(frame["rsa_key"], "a3VuY2k=")
+        self.assertEqual(frame["message"], "Y2lwaGVy")
+
+    def test_old_format_rejected(self):
+        # Frame JSON dari versi lama ditolak oleh magic, bukan oleh panjang field palsu
+        with self.assertRaisesRegex(ValueError, "format frame tidak dikenal"):
+            core._parse_frame(b'{"message_length": 5}' + bytes(64))
+
+
+if __name__ == '__main__':
+    unittest.main()